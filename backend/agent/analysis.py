@@ -0,0 +1,96 @@
+"""
+Structured output schema and parser for the analysis node.
+
+The analysis model runs in provider JSON mode and returns a compact object,
+validated with Pydantic instead of scraped with a regex. Output that does not
+validate is counted in metrics so silent fallbacks to 'vague' are visible.
+"""
+
+import logging
+from typing import Any, Literal, Optional
+
+from pydantic import BaseModel, ValidationError, field_validator
+
+from runtime.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+Quality = Literal["correct", "incorrect", "vague", "shallow"]
+
+# Provider-native JSON mode (supported by both Groq and OpenAI chat APIs)
+JSON_MODE = {"response_format": {"type": "json_object"}}
+
+TOPIC_MAX_CHARS = 80
+
+
+class Analysis(BaseModel):
+    """Classification of one explanation."""
+
+    quality: Quality
+    topic: Optional[str] = None
+
+    @field_validator("quality", mode="before")
+    @classmethod
+    def _normalize_quality(cls, value):
+        return value.strip().lower() if isinstance(value, str) else value
+
+    @field_validator("topic", mode="before")
+    @classmethod
+    def _truncate_topic(cls, value):
+        return value.strip()[:TOPIC_MAX_CHARS] if isinstance(value, str) else value
+
+
+class BatchAnalysisItem(Analysis):
+    """Classification of one numbered explanation in a batch."""
+
+    id: int
+
+
+class BatchAnalysis(BaseModel):
+    """Classifications for a batch of explanations.
+
+    Items are validated one by one as ``BatchAnalysisItem`` so a single bad
+    item does not discard the rest.
+    """
+
+    results: list[Any]
+
+
+def parse_analysis(content: str, node: str = "analyze") -> Optional[Analysis]:
+    """Validate a JSON analysis, or None (counted as a parse failure).
+
+    Args:
+        content: Model output
+        node: Graph node, for metrics
+    """
+    try:
+        return Analysis.model_validate_json(content)
+    except ValidationError as e:
+        metrics.inc("analysis_parse_failures_total", node=node)
+        logger.warning(f"Invalid analysis output ({e.error_count()} errors): {content[:200]!r}")
+        return None
+
+
+def parse_batch_analysis(content: str) -> dict[int, Analysis]:
+    """Validate a JSON batch analysis into a map of item id to analysis.
+
+    Each invalid item is counted as one parse failure and left out; output
+    without a ``results`` list counts as a single failure.
+    """
+    try:
+        batch = BatchAnalysis.model_validate_json(content)
+    except ValidationError as e:
+        metrics.inc("analysis_parse_failures_total", node="analyze_batch")
+        logger.warning(f"Invalid batch analysis output ({e.error_count()} errors): {content[:200]!r}")
+        return {}
+
+    analyses = {}
+    for raw in batch.results:
+        try:
+            item = BatchAnalysisItem.model_validate(raw)
+        except ValidationError as e:
+            metrics.inc("analysis_parse_failures_total", node="analyze_batch")
+            logger.warning(f"Invalid batch analysis item ({e.error_count()} errors): {str(raw)[:200]!r}")
+            continue
+        analyses[item.id] = item
+    return analyses
@@ -0,0 +1,127 @@
+"""
+Cross-session micro-batching of analysis requests.
+
+Under load many sessions run the analyze node within the same few hundred
+milliseconds. The batcher holds requests for a short window (or until the
+batch is full), classifies them together in one LLM call and resolves each
+session's future with its own result, trading a few milliseconds of wait for
+far fewer provider requests.
+"""
+
+import asyncio
+import contextvars
+import logging
+from dataclasses import dataclass, field
+from typing import Optional
+
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from .analysis import JSON_MODE, Analysis, parse_batch_analysis
+from .llm import ainvoke_tracked, get_llm, node_config
+from .prompts import BATCH_ANALYSIS_PROMPT, BATCH_ANALYSIS_ITEM
+from runtime.metrics import metrics
+from runtime.tracing import span
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64)
+
+
+@dataclass
+class _Pending:
+    user_input: str
+    context: str
+    future: asyncio.Future = field(repr=False)
+
+
+class AnalysisBatcher:
+    """Collects analysis requests and classifies them in batched LLM calls."""
+
+    def __init__(self, llm, model: str, window: float = 0.05, max_batch: int = 16):
+        """Initialize the batcher.
+
+        Args:
+            llm: Chat model used for batched classification
+            model: Model name, for metrics
+            window: Seconds to wait for more requests after the first arrives
+            max_batch: Maximum requests per LLM call
+        """
+        self.llm = llm
+        self.model = model
+        self.window = window
+        self.max_batch = max_batch
+        self._pending: list[_Pending] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def classify(self, user_input: str, context: str) -> Optional[Analysis]:
+        """Queue one explanation and wait for its analysis.
+
+        Args:
+            user_input: The student's explanation
+            context: Recent conversation, already formatted
+
+        Returns:
+            The analysis for this explanation, or None if the batch failed
+        """
+        loop = asyncio.get_running_loop()
+        pending = _Pending(user_input, context, loop.create_future())
+        self._pending.append(pending)
+
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        with span("analysis:batch_wait"):
+            return await pending.future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+        if self._pending:
+            self._timer = asyncio.get_running_loop().call_later(self.window, self._flush)
+        if batch:
+            # The batch serves many sessions, so it must not run in the context
+            # (trace, loop-monitor stage) of whichever one triggered the flush
+            task = asyncio.get_running_loop().create_task(self._run(batch), context=contextvars.Context())
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: list[_Pending]) -> None:
+        metrics.observe("analysis_batch_size", len(batch), buckets=BATCH_SIZE_BUCKETS)
+        items = "\n\n".join(
+            BATCH_ANALYSIS_ITEM.format(id=i, context=p.context, user_input=p.user_input)
+            for i, p in enumerate(batch, start=1)
+        )
+        try:
+            response = await ainvoke_tracked(self.llm, [
+                SystemMessage(content="You are an expert at analyzing explanations for accuracy and depth. Respond only with valid JSON."),
+                HumanMessage(content=BATCH_ANALYSIS_PROMPT.format(items=items)),
+            ], node="analyze_batch", model=self.model)
+            results = parse_batch_analysis(response.content)
+        except Exception as e:
+            logger.warning(f"Batched analysis of {len(batch)} requests failed: {e}")
+            results = {}
+
+        for i, pending in enumerate(batch, start=1):
+            if not pending.future.done():
+                pending.future.set_result(results.get(i))
+
+
+_batcher: Optional[AnalysisBatcher] = None
+
+
+def get_analysis_batcher(settings) -> AnalysisBatcher:
+    """Get the process-wide analysis batcher."""
+    global _batcher
+    if _batcher is None:
+        config = node_config(settings, "analyze")
+        _batcher = AnalysisBatcher(
+            get_llm(settings, "analyze", max_tokens=config.max_tokens * settings.analysis_batch_max).bind(**JSON_MODE),
+            config.model,
+            window=settings.analysis_batch_window_ms / 1000,
+            max_batch=settings.analysis_batch_max,
+        )
+    return _batcher
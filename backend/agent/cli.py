@@ -32,6 +32,8 @@ async def main():
     
     # Session state
     messages = []
+    topic = None
+    quality = None
     turn = 0
     
     print("🎓 Tutor: What concept would you like to explain to me today?\n")
@@ -56,14 +58,15 @@ async def main():
             result = await graph.ainvoke({
                 "messages": messages,
                 "user_input": user_input,
-                "current_topic": None,
-                "explanation_quality": None,
+                "current_topic": topic,
+                "explanation_quality": quality,
                 "turn_count": turn,
             })
             
             response = result.get("response_text", "I need you to try explaining that again.")
             quality = result.get("explanation_quality", "unknown")
             messages = result.get("messages", messages)
+            topic = result.get("current_topic", topic)
             turn += 1
             
             # Quality indicator
@@ -72,6 +75,7 @@ async def main():
                 "incorrect": "❌",
                 "shallow": "🔍",
                 "vague": "❓",
+                "gave_up": "🏳️",
             }
             quality_icon = quality_icons.get(quality, "💭")
             
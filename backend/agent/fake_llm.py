@@ -0,0 +1,71 @@
+"""
+Fake chat model for load testing.
+
+Selected with ``LLM_PROVIDER=fake``. It sleeps for a configurable latency and
+returns canned replies shaped like the real ones (JSON for analysis, tagged
+analysis/response text for the tutor), so the whole pipeline runs end to end
+without provider calls.
+"""
+
+import asyncio
+import json
+import time
+from typing import Any, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+FAKE_ANALYSIS = '{"quality": "shallow", "topic": "photosynthesis"}'
+
+FAKE_RESPONSE = """<analysis>
+- Accuracy: partially correct
+- Depth: shallow
+- Gaps: mechanism not explained
+</analysis>
+
+<response>
+You've described what happens. Now tell me why it has to happen that way - what would break if one of those ingredients were missing?
+</response>"""
+
+
+class FakeChatModel(BaseChatModel):
+    """Chat model stand-in with simulated latency."""
+
+    latency: float = 0.3
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+
+    def _reply(self, messages: list[BaseMessage]) -> ChatResult:
+        wants_json = any("JSON" in str(m.content) for m in messages[:1])
+        batch_size = str(messages[-1].content).count("### Explanation ")
+        if wants_json and batch_size:
+            content = json.dumps({"results": [
+                {"id": i, **json.loads(FAKE_ANALYSIS)} for i in range(1, batch_size + 1)
+            ]})
+        else:
+            content = FAKE_ANALYSIS if wants_json else FAKE_RESPONSE
+        prompt_chars = sum(len(str(m.content)) for m in messages)
+        message = AIMessage(
+            content=content,
+            usage_metadata={
+                "input_tokens": prompt_chars // 4,
+                "output_tokens": len(content) // 4,
+                "total_tokens": (prompt_chars + len(content)) // 4,
+            },
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(self, messages: list[BaseMessage], stop: Optional[list[str]] = None, run_manager=None, **kwargs: Any) -> ChatResult:
+        time.sleep(self.latency)
+        return self._reply(messages)
+
+    async def _agenerate(self, messages: list[BaseMessage], stop: Optional[list[str]] = None, run_manager=None, **kwargs: Any) -> ChatResult:
+        await asyncio.sleep(self.latency)
+        return self._reply(messages)
+
+    def bind_tools(self, tools, **kwargs: Any):
+        """Accept tools but never call them."""
+        return self
@@ -2,9 +2,10 @@
 LangGraph State Machine for the Socratic Tutor with Tavily Web Search.
 """
 
-import json
+import asyncio
 import re
 import logging
+import time
 from typing import Literal, Annotated, Sequence
 import operator
 
@@ -12,35 +13,23 @@ from langgraph.graph import StateGraph, END
 from langgraph.prebuilt import ToolNode
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage, BaseMessage
 from langchain_core.tools import tool
-from tavily import TavilyClient
 
 from .state import SessionState
 from .prompts import SOCRATIC_SYSTEM_PROMPT, ANALYSIS_PROMPT
+from .search import WebSearcher, get_web_searcher
+from .llm import ainvoke_tracked, get_llm, node_config
+from .analysis import JSON_MODE, parse_analysis
+from .policy import plan_analysis
+from .batcher import get_analysis_batcher
+from runtime.metrics import metrics
+from runtime.offload import run_cpu
+from runtime.tracing import span
 
 logger = logging.getLogger(__name__)
 
 
-def get_llm(settings):
-    """Get the appropriate LLM based on settings."""
-    if settings.llm_provider == "groq":
-        from langchain_groq import ChatGroq
-        return ChatGroq(
-            model=settings.groq_model,
-            api_key=settings.groq_api_key,
-            temperature=0.7,
-        )
-    else:
-        from langchain_openai import ChatOpenAI
-        return ChatOpenAI(
-            model=settings.openai_model,
-            api_key=settings.openai_api_key,
-            temperature=0.7,
-        )
-
-
-def create_tavily_tool(api_key: str):
+def create_tavily_tool(searcher: WebSearcher):
     """Create a Tavily search tool."""
-    client = TavilyClient(api_key=api_key)
     
     @tool
     def search_web(query: str) -> str:
@@ -57,38 +46,63 @@ def create_tavily_tool(api_key: str):
         Returns:
             Search results with relevant information
         """
-        try:
-            response = client.search(
-                query=query,
-                search_depth="basic",
-                max_results=3,
-            )
-            
-            results = []
-            for result in response.get("results", []):
-                results.append(f"**{result.get('title', 'No title')}**\n{result.get('content', '')}\nSource: {result.get('url', '')}")
-            
-            if results:
-                return "\n\n---\n\n".join(results)
-            else:
-                return "No relevant results found."
-                
-        except Exception as e:
-            logger.error(f"Tavily search failed: {e}")
-            return f"Search failed: {str(e)}"
+        return searcher.search(query)
     
     return search_web
 
 
+def extract_response_text(response_text: str) -> str:
+    """Strip the <analysis> block from a tutor reply, keeping only the response."""
+    # Strategy 1: Look for explicit <response> tags
+    if "<response>" in response_text:
+        match = re.search(r'<response>(.*?)</response>', response_text, re.DOTALL)
+        if match:
+            response_text = match.group(1).strip()
+    
+    # Strategy 2: If no <response> tags, look for the end of the analysis block
+    elif "</analysis>" in response_text:
+        parts = response_text.split("</analysis>")
+        if len(parts) > 1:
+            response_text = parts[-1].strip()
+    
+    # Strategy 3: If no tags but "Analysis:" keyword appears at the start
+    elif response_text.strip().lower().startswith("analysis:") or response_text.strip().lower().startswith("<analysis>"):
+        # aggressive fallback: try to find the start of the actual response
+        # assume double newline separates analysis from response
+        parts = re.split(r'\n\s*\n', response_text, maxsplit=1)
+        if len(parts) > 1:
+            response_text = parts[-1].strip()
+    
+    return response_text
+
+
+def timed_node(name: str, node):
+    """Wrap a graph node to record its latency and trace span."""
+    async def run(state: SessionState) -> SessionState:
+        started = time.perf_counter()
+        try:
+            with span(f"node:{name}"):
+                return await node(state)
+        finally:
+            metrics.observe("node_latency_seconds", time.perf_counter() - started, node=name)
+    return run
+
+
 def create_tutor_graph(settings):
     """Create the LangGraph state machine for tutoring sessions."""
     
-    llm = get_llm(settings)
+    analyze_config = node_config(settings, "analyze")
+    respond_config = node_config(settings, "respond")
+    analysis_llm = get_llm(settings, "analyze").bind(**JSON_MODE)
+    llm = get_llm(settings, "respond")
+    batcher = get_analysis_batcher(settings) if settings.analysis_batching else None
+    logger.info(f"Models: analyze={analyze_config.model}, respond={respond_config.model}")
     
     # Create tools
     tools = []
-    if settings.tavily_api_key:
-        search_tool = create_tavily_tool(settings.tavily_api_key)
+    searcher = get_web_searcher(settings)
+    if searcher is not None:
+        search_tool = create_tavily_tool(searcher)
         tools.append(search_tool)
         logger.info("Tavily web search enabled")
     
@@ -103,6 +117,21 @@ def create_tutor_graph(settings):
         """Analyze the quality and accuracy of the user's explanation."""
         user_input = state.get("user_input", "")
         messages = state.get("messages", [])
+        topic = state.get("current_topic")
+        
+        # Skip the model for turns whose label is already known
+        if settings.analysis_skip_enabled:
+            quality, reason = plan_analysis(
+                user_input,
+                state.get("explanation_quality"),
+                min_words=settings.analysis_min_words,
+            )
+            if quality is not None:
+                metrics.inc("analysis_skipped_total", reason=reason)
+                return {
+                    **state,
+                    "explanation_quality": quality,
+                }
         
         # Build context from previous messages
         context = "\n".join([
@@ -110,24 +139,26 @@ def create_tutor_graph(settings):
             for m in messages[-6:]  # Last 3 exchanges
         ])
         
-        analysis_prompt = ANALYSIS_PROMPT.format(
-            user_input=user_input,
-            context=context if context else "No previous context",
-        )
+        context = context if context else "No previous context"
         
         try:
-            response = await llm.ainvoke([
-                SystemMessage(content="You are an expert at analyzing explanations for accuracy and depth. Respond only with valid JSON."),
-                HumanMessage(content=analysis_prompt),
-            ])
+            if batcher is not None:
+                # Classify together with other sessions' pending turns
+                analysis = await batcher.classify(user_input, context)
+            else:
+                analysis_prompt = ANALYSIS_PROMPT.format(
+                    user_input=user_input,
+                    context=context,
+                )
+                response = await ainvoke_tracked(analysis_llm, [
+                    SystemMessage(content="You are an expert at analyzing explanations for accuracy and depth. Respond only with valid JSON."),
+                    HumanMessage(content=analysis_prompt),
+                ], node="analyze", model=analyze_config.model)
+                analysis = parse_analysis(response.content)
             
-            # Parse JSON from response
-            content = response.content
-            # Try to extract JSON from the response
-            json_match = re.search(r'\{[^{}]*\}', content, re.DOTALL)
-            if json_match:
-                analysis = json.loads(json_match.group())
-                quality = analysis.get("quality", "vague")
+            if analysis is not None:
+                quality = analysis.quality
+                topic = analysis.topic or topic
             else:
                 quality = "vague"
         except Exception as e:
@@ -137,6 +168,7 @@ def create_tutor_graph(settings):
         return {
             **state,
             "explanation_quality": quality,
+            "current_topic": topic,
         }
     
     # Node: Generate Socratic response (with optional tool use)
@@ -177,6 +209,7 @@ Do NOT use search for:
             "incorrect": "The user's explanation contains errors. Guide them to discover the mistake.",
             "shallow": "The explanation is correct but surface-level. Push for the 'why'.",
             "vague": "The explanation is unclear. Ask for clarification and specifics.",
+            "gave_up": "The user has admitted defeat or asked for help. Now give a clear, simple explanation using analogies and first principles.",
         }
         
         enhanced_input = f"""User's explanation: {user_input}
@@ -187,7 +220,7 @@ Do NOT use search for:
         
         try:
             # First call - might request tool use
-            response = await llm_with_tools.ainvoke(llm_messages)
+            response = await ainvoke_tracked(llm_with_tools, llm_messages, node="respond", model=respond_config.model)
             
             # Handle tool calls if present
             if hasattr(response, 'tool_calls') and response.tool_calls:
@@ -195,38 +228,26 @@ Do NOT use search for:
                 tool_results = []
                 for tool_call in response.tool_calls:
                     if tool_call['name'] == 'search_web' and tools:
-                        search_result = tools[0].invoke(tool_call['args'])
+                        with span("tool:search_web"):
+                            search_result = await asyncio.to_thread(
+                                searcher.search,
+                                tool_call['args'].get('query', ''),
+                                state.get("current_topic"),
+                            )
                         tool_results.append(f"[Search results for '{tool_call['args'].get('query', '')}']:\n{search_result}")
                 
                 # Add tool results and get final response
                 if tool_results:
                     llm_messages.append(response)
                     llm_messages.append(HumanMessage(content="\n\n".join(tool_results)))
-                    response = await llm.ainvoke(llm_messages)
-            
-            response_text = response.content
+                    response = await ainvoke_tracked(llm, llm_messages, node="respond", model=respond_config.model)
             
-            # Extract just the response part if analysis tags are present
-            # Extract just the response part
-            # Strategy 1: Look for explicit <response> tags
-            if "<response>" in response_text:
-                match = re.search(r'<response>(.*?)</response>', response_text, re.DOTALL)
-                if match:
-                    response_text = match.group(1).strip()
-            
-            # Strategy 2: If no <response> tags, look for the end of the analysis block
-            elif "</analysis>" in response_text:
-                parts = response_text.split("</analysis>")
-                if len(parts) > 1:
-                    response_text = parts[-1].strip()
-            
-            # Strategy 3: If no tags but "Analysis:" keyword appears at the start
-            elif response_text.strip().lower().startswith("analysis:") or response_text.strip().lower().startswith("<analysis>"):
-                # aggressive fallback: try to find the start of the actual response
-                # assume double newline separates analysis from response
-                parts = re.split(r'\n\s*\n', response_text, maxsplit=1)
-                if len(parts) > 1:
-                    response_text = parts[-1].strip()
+            response_text = await run_cpu(
+                "extract_response",
+                extract_response_text,
+                response.content,
+                size=len(response.content),
+            )
                     
         except Exception as e:
             logger.error(f"Response generation failed: {e}")
@@ -248,8 +269,8 @@ Do NOT use search for:
     workflow = StateGraph(SessionState)
     
     # Add nodes
-    workflow.add_node("analyze", analyze_explanation)
-    workflow.add_node("respond", generate_response)
+    workflow.add_node("analyze", timed_node("analyze", analyze_explanation))
+    workflow.add_node("respond", timed_node("respond", generate_response))
     
     # Define edges
     workflow.set_entry_point("analyze")
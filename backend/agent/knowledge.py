@@ -0,0 +1,336 @@
+"""
+Cross-session knowledge index of past web search results.
+
+Search results are chunked and stored with lightweight hashed bag-of-words
+embeddings in memory-mapped NumPy matrices, so popular topics are answered
+from disk instead of a fresh Tavily query, and only the chunks most similar
+to the query are added to the prompt.
+
+Layout of the index directory:
+    searches.f32 / searches.jsonl   one row per past query (vector + metadata)
+    chunks.f32   / chunks.jsonl     one row per result chunk (vector + metadata)
+
+Worker processes can share a directory: appends are serialized with a lock
+file (``index.lock``), and each process picks up rows written by the others
+before it appends or looks up. Without ``fcntl`` (Windows) the lock is a no-op,
+so use one directory per worker process there.
+"""
+
+import json
+import logging
+import re
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_DIM = 512
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from how in is it of on or that the this to what when where which who why with".split()
+)
+
+
+def embed(text: str, dim: int = EMBEDDING_DIM) -> np.ndarray:
+    """Embed text as an L2-normalized signed feature-hashed unigram+bigram vector."""
+    tokens = [t for t in _TOKEN_RE.findall(text.lower()) if t not in _STOPWORDS]
+    features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    vector = np.zeros(dim, dtype=np.float32)
+    if not features:
+        return vector
+    hashes = np.fromiter((zlib.crc32(f.encode("utf-8")) for f in features), dtype=np.uint64, count=len(features))
+    signs = np.where(hashes & (1 << 31), -1.0, 1.0).astype(np.float32)
+    np.add.at(vector, (hashes % dim).astype(np.intp), signs)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def chunk_text(text: str, max_chars: int = 500) -> list[str]:
+    """Split text into sentence-aligned chunks of at most ``max_chars``."""
+    chunks, current = [], ""
+    for sentence in _SENTENCE_RE.split(text.strip()):
+        if current and len(current) + len(sentence) + 1 > max_chars:
+            chunks.append(current)
+            current = ""
+        current = f"{current} {sentence}".strip()
+        while len(current) > max_chars:
+            chunks.append(current[:max_chars])
+            current = current[max_chars:]
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def normalize_topic(topic: Optional[str]) -> Optional[str]:
+    """Canonical form of a topic label for matching."""
+    if not topic:
+        return None
+    return " ".join(_TOKEN_RE.findall(topic.lower())) or None
+
+
+class _VectorStore:
+    """Append-only float32 matrix backed by a growable memory-mapped file."""
+
+    def __init__(self, path: Path, dim: int, count: int, initial_capacity: int = 256):
+        self.path = path
+        self.dim = dim
+        self.count = count
+        existing = path.stat().st_size // (dim * 4) if path.exists() else 0
+        self._open(max(existing, count, initial_capacity))
+
+    def _open(self, capacity: int) -> None:
+        with open(self.path, "ab") as f:
+            # Never shrink: another process may have grown the file further
+            f.truncate(max(capacity * self.dim * 4, f.tell()))
+        self.matrix = np.memmap(self.path, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+
+    def append(self, vectors: np.ndarray) -> None:
+        needed = self.count + len(vectors)
+        if needed > self.matrix.shape[0]:
+            self.matrix.flush()
+            del self.matrix
+            self._open(max(needed, self.count * 2))
+        self.matrix[self.count:needed] = vectors
+        self.matrix.flush()
+        self.count = needed
+
+    def extend(self, count: int) -> None:
+        """Adopt rows appended to the file by another process."""
+        if count > self.matrix.shape[0]:
+            del self.matrix
+            self._open(count)
+        self.count = count
+
+    @property
+    def rows(self) -> np.ndarray:
+        return self.matrix[:self.count]
+
+
+class KnowledgeIndex:
+    """Similarity index over past search results, shared by all sessions."""
+
+    def __init__(self, directory: str, ttl_seconds: float = 72 * 3600, min_similarity: float = 0.6,
+                 prefetch_min_similarity: float = 0.25, chunk_min_similarity: float = 0.3,
+                 chunk_chars: int = 500, dim: int = EMBEDDING_DIM):
+        """Open (or create) an index.
+
+        Args:
+            directory: Directory holding the index files
+            ttl_seconds: Age after which a stored search is considered stale
+            min_similarity: Cosine similarity a past query needs to count as a hit
+            prefetch_min_similarity: Cosine similarity a prefetched (guessed) query needs
+                before its chunks are considered
+            chunk_min_similarity: Cosine similarity a chunk of a prefetched search needs to count as a hit
+            chunk_chars: Maximum characters per stored chunk
+            dim: Embedding dimension
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.min_similarity = min_similarity
+        self.prefetch_min_similarity = prefetch_min_similarity
+        self.chunk_min_similarity = chunk_min_similarity
+        self.chunk_chars = chunk_chars
+        self.dim = dim
+        self._lock = threading.Lock()
+        self._searches_path = self.directory / "searches.jsonl"
+        self._chunks_path = self.directory / "chunks.jsonl"
+
+        with self._file_lock():
+            self._searches, self._searches_offset = self._read_jsonl(self._searches_path)
+            self._chunks, self._chunks_offset = self._read_jsonl(self._chunks_path)
+            self._search_vectors = _VectorStore(self.directory / "searches.f32", dim, len(self._searches))
+            self._chunk_vectors = _VectorStore(self.directory / "chunks.f32", dim, len(self._chunks))
+        self._search_ts = np.array([s["ts"] for s in self._searches], dtype=np.float64)
+        self._search_prefetched = np.array([s.get("prefetched", False) for s in self._searches], dtype=bool)
+        self._chunk_search = np.array([c["search"] for c in self._chunks], dtype=np.int64)
+        logger.info(f"Knowledge index loaded: {len(self._searches)} searches, {len(self._chunks)} chunks")
+
+    @contextmanager
+    def _file_lock(self):
+        """Hold the directory's lock file, excluding other worker processes."""
+        with open(self.directory / "index.lock", "a") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            yield
+
+    @staticmethod
+    def _read_jsonl(path: Path, offset: int = 0) -> tuple[list[dict], int]:
+        """Records after byte ``offset`` and the offset of the end of the last one."""
+        if not path.exists():
+            return [], offset
+        with open(path, "rb") as f:
+            f.seek(offset)
+            data = f.read()
+        data = data[:data.rfind(b"\n") + 1]
+        records = [json.loads(line) for line in data.decode("utf-8").splitlines() if line.strip()]
+        return records, offset + len(data)
+
+    @staticmethod
+    def _append_jsonl(path: Path, records: list[dict]) -> int:
+        """Append records and return the new file size."""
+        with open(path, "a", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            return f.tell()
+
+    def _changed_on_disk(self) -> bool:
+        try:
+            return self._searches_path.stat().st_size != self._searches_offset
+        except FileNotFoundError:
+            return False
+
+    def _reload(self) -> None:
+        """Adopt searches other processes appended; call with both locks held."""
+        searches, self._searches_offset = self._read_jsonl(self._searches_path, self._searches_offset)
+        chunks, self._chunks_offset = self._read_jsonl(self._chunks_path, self._chunks_offset)
+        if not searches and not chunks:
+            return
+        self._searches.extend(searches)
+        self._chunks.extend(chunks)
+        self._search_vectors.extend(len(self._searches))
+        self._chunk_vectors.extend(len(self._chunks))
+        self._search_ts = np.append(self._search_ts, [s["ts"] for s in searches])
+        self._search_prefetched = np.append(
+            self._search_prefetched, np.array([s.get("prefetched", False) for s in searches], dtype=bool),
+        )
+        self._chunk_search = np.append(self._chunk_search, np.array([c["search"] for c in chunks], dtype=np.int64))
+
+    def __len__(self) -> int:
+        return len(self._searches)
+
+    def add(self, query: str, results: list[dict], topic: Optional[str] = None, prefetched: bool = False) -> None:
+        """Store the results of a web search.
+
+        Args:
+            query: The search query
+            results: Search results with 'title', 'content' and 'url'
+            topic: Session topic the search was made under
+            prefetched: Whether the query was a guess rather than a real search
+        """
+        chunks = [
+            {"title": r.get("title", "No title"), "url": r.get("url", ""), "text": text}
+            for r in results
+            for text in chunk_text(r.get("content", ""), self.chunk_chars)
+        ]
+        if not chunks:
+            return
+
+        with self._lock, self._file_lock():
+            self._reload()
+            search_id = len(self._searches)
+            now = time.time()
+            search = {"query": query, "topic": normalize_topic(topic), "ts": now}
+            if prefetched:
+                search["prefetched"] = True
+            for chunk in chunks:
+                chunk["search"] = search_id
+
+            self._search_vectors.append(embed(query, self.dim)[None, :])
+            self._chunk_vectors.append(np.stack([embed(c["text"], self.dim) for c in chunks]))
+            self._chunks_offset = self._append_jsonl(self._chunks_path, chunks)
+            self._searches_offset = self._append_jsonl(self._searches_path, [search])
+            self._searches.append(search)
+            self._chunks.extend(chunks)
+            self._search_ts = np.append(self._search_ts, now)
+            self._search_prefetched = np.append(self._search_prefetched, prefetched)
+            self._chunk_search = np.append(self._chunk_search, np.full(len(chunks), search_id, dtype=np.int64))
+
+    def lookup(self, query: str, topic: Optional[str] = None, k: int = 4) -> list[dict]:
+        """Find stored chunks answering ``query``.
+
+        A hit requires a fresh past query at least ``min_similarity`` similar to
+        this one. When ``topic`` is known and has stored searches, searches made
+        under other topics are excluded.
+
+        Prefetched searches were made for guessed queries, so their chunks are
+        also matched directly, but only for a caller with the same topic and a
+        guess at least ``prefetch_min_similarity`` similar to the query; any of
+        their chunks at least ``chunk_min_similarity`` similar to the query
+        counts. Chunks from all matching searches are ranked against the query.
+
+        Args:
+            query: The search query
+            topic: Current session topic, used to narrow candidates
+            k: Maximum chunks to return
+
+        Returns:
+            Chunk records ('title', 'url', 'text', 'score', 'prefetched'), best first;
+            empty on a miss
+        """
+        with self._lock:
+            if self._changed_on_disk():
+                with self._file_lock():
+                    self._reload()
+            if not self._searches:
+                return []
+            query_vector = embed(query, self.dim)
+            eligible = self._search_ts >= time.time() - self.ttl_seconds
+
+            topic = normalize_topic(topic)
+            topics = [s["topic"] for s in self._searches]
+            if topic and topic in topics:
+                eligible &= np.array([t in (None, topic) for t in topics])
+
+            scores = self._search_vectors.rows @ query_vector
+            matching = np.flatnonzero(eligible & (scores >= self.min_similarity))
+            if topic:
+                same_topic = np.array([t == topic for t in topics])
+                speculative = np.flatnonzero(
+                    eligible & same_topic & self._search_prefetched & (scores >= self.prefetch_min_similarity)
+                )
+            else:
+                speculative = np.empty(0, dtype=np.int64)
+            if not len(matching) and not len(speculative):
+                return []
+
+            rows = np.flatnonzero(np.isin(self._chunk_search, np.union1d(matching, speculative)))
+            chunk_scores = self._chunk_vectors.rows[rows] @ query_vector
+            keep = np.isin(self._chunk_search[rows], matching) | (chunk_scores >= self.chunk_min_similarity)
+            rows, chunk_scores = rows[keep], chunk_scores[keep]
+            hits, seen = [], set()
+            for i in np.argsort(-chunk_scores):
+                chunk = self._chunks[rows[i]]
+                if chunk["text"] in seen:
+                    continue
+                seen.add(chunk["text"])
+                prefetched = bool(self._search_prefetched[chunk["search"]])
+                hits.append({**chunk, "score": float(chunk_scores[i]), "prefetched": prefetched})
+                if len(hits) == k:
+                    break
+            return hits
+
+
+_indexes: dict[str, KnowledgeIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_knowledge_index(settings) -> Optional[KnowledgeIndex]:
+    """Get the process-wide knowledge index, or None when disabled."""
+    if not settings.knowledge_index_enabled:
+        return None
+    with _indexes_lock:
+        index = _indexes.get(settings.knowledge_index_dir)
+        if index is None:
+            index = _indexes[settings.knowledge_index_dir] = KnowledgeIndex(
+                settings.knowledge_index_dir,
+                ttl_seconds=settings.knowledge_ttl_hours * 3600,
+                min_similarity=settings.knowledge_min_similarity,
+                prefetch_min_similarity=settings.knowledge_prefetch_min_similarity,
+                chunk_min_similarity=settings.knowledge_chunk_min_similarity,
+                chunk_chars=settings.knowledge_chunk_chars,
+            )
+        return index
@@ -0,0 +1,141 @@
+"""
+Per-node LLM configuration and usage accounting.
+
+Each graph node gets its own provider, model, temperature and output-token
+cap from ``Settings`` (``analyze_*`` / ``respond_*``), so cheap classification
+can run on a small model while the Socratic reply uses a large one. Calls made
+through ``ainvoke_tracked`` record latency, tokens and estimated cost per node.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from runtime.metrics import metrics
+from runtime.tracing import span
+
+# Small, fast defaults for classification-style nodes
+SMALL_MODELS = {
+    "groq": "llama-3.1-8b-instant",
+    "openai": "gpt-4o-mini",
+    "fake": "fake",
+}
+
+# USD per million (input, output) tokens, used for cost estimates
+MODEL_PRICES = {
+    "llama-3.3-70b-versatile": (0.59, 0.79),
+    "llama-3.1-8b-instant": (0.05, 0.08),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+}
+
+
+@dataclass
+class NodeLLMConfig:
+    """Resolved model settings for one graph node."""
+
+    provider: str
+    model: str
+    temperature: float
+    max_tokens: Optional[int]  # None leaves output uncapped
+
+
+def node_config(settings, node: str = "respond") -> NodeLLMConfig:
+    """Resolve the model settings for a graph node.
+
+    Args:
+        settings: Application settings
+        node: 'analyze' or 'respond'
+
+    Returns:
+        The node's provider, model, temperature and token cap
+    """
+    provider = getattr(settings, f"{node}_provider") or settings.llm_provider
+    model = getattr(settings, f"{node}_model")
+    if not model:
+        default_model = {"openai": settings.openai_model, "fake": "fake"}.get(provider, settings.groq_model)
+        model = SMALL_MODELS.get(provider, default_model) if node == "analyze" else default_model
+    return NodeLLMConfig(
+        provider=provider,
+        model=model,
+        temperature=getattr(settings, f"{node}_temperature"),
+        max_tokens=getattr(settings, f"{node}_max_tokens"),
+    )
+
+
+def get_llm(settings, node: str = "respond", max_tokens: Optional[int] = None):
+    """Get the LLM configured for a graph node.
+
+    Args:
+        settings: Application settings
+        node: 'analyze' or 'respond'
+        max_tokens: Override for the node's output-token cap
+    """
+    config = node_config(settings, node)
+    if max_tokens is not None:
+        config.max_tokens = max_tokens
+    return create_llm(settings, config)
+
+
+def create_llm(settings, config: NodeLLMConfig):
+    """Instantiate a chat model for an explicit configuration.
+
+    Args:
+        settings: Application settings (API keys, fake-provider latency)
+        config: Provider, model, temperature and token cap
+    """
+    if config.provider == "groq":
+        from langchain_groq import ChatGroq
+        return ChatGroq(
+            model=config.model,
+            api_key=settings.groq_api_key,
+            temperature=config.temperature,
+            max_tokens=config.max_tokens,
+        )
+    elif config.provider == "fake":
+        from .fake_llm import FakeChatModel
+        return FakeChatModel(latency=settings.fake_llm_latency_ms / 1000)
+    else:
+        from langchain_openai import ChatOpenAI
+        return ChatOpenAI(
+            model=config.model,
+            api_key=settings.openai_api_key,
+            temperature=config.temperature,
+            max_tokens=config.max_tokens,
+        )
+
+
+def estimate_cost(model: str, input_tokens: int, output_tokens: int) -> float:
+    """Estimated USD cost of a call, 0.0 for unknown models."""
+    input_price, output_price = MODEL_PRICES.get(model, (0.0, 0.0))
+    return (input_tokens * input_price + output_tokens * output_price) / 1_000_000
+
+
+def record_usage(node: str, model: str, response, elapsed: float) -> None:
+    """Record latency, token and cost metrics for one LLM response."""
+    metrics.observe("llm_latency_seconds", elapsed, node=node, model=model)
+    usage = getattr(response, "usage_metadata", None) or {}
+    input_tokens = usage.get("input_tokens", 0)
+    output_tokens = usage.get("output_tokens", 0)
+    metrics.inc("llm_tokens_total", input_tokens, node=node, model=model, kind="input")
+    metrics.inc("llm_tokens_total", output_tokens, node=node, model=model, kind="output")
+    metrics.inc("llm_cost_usd_total", estimate_cost(model, input_tokens, output_tokens), node=node, model=model)
+
+
+async def ainvoke_tracked(llm, messages, node: str, model: str):
+    """Invoke ``llm`` and record per-node latency, tokens and cost.
+
+    Args:
+        llm: Chat model (or runnable) to call
+        messages: Input messages
+        node: Graph node making the call
+        model: Model name, for labels and pricing
+
+    Returns:
+        The model response
+    """
+    started = time.perf_counter()
+    with span(f"llm:{node}", model=model):
+        response = await llm.ainvoke(messages)
+    record_usage(node, model, response, time.perf_counter() - started)
+    return response
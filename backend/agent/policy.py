@@ -0,0 +1,43 @@
+"""
+Adaptive analysis policy.
+
+Decides when the analysis LLM call can be skipped: a student who gives up
+needs an explanation regardless of classification, and very short follow-up
+replies ("yes", "because energy") carry too little signal to re-grade, so the
+previous label is reused. Give-up phrases only count when they are the whole
+message, since explanations often start with hedges like "No idea why, but".
+"""
+
+import re
+from typing import Optional
+
+ANALYSIS_LABELS = ("correct", "incorrect", "vague", "shallow")
+
+_GIVE_UP_PHRASE = (
+    r"(i give up|i (really )?(don'?t|do not) know|i dunno|idk|(i have )?no idea|i'?m (stuck|lost|not sure)|"
+    r"(just )?tell me( the answer)?|(can|could) you (just )?(explain|tell me)( it| that| this)?( to me)?|"
+    r"(please )?explain( it| that| this)?( to me)?|help( me)?)"
+)
+# The whole message must be give-up phrases, optionally after a filler word
+GIVE_UP_RE = re.compile(
+    rf"\W*((honestly|sorry|um+|uh+|ok(ay)?|well|hmm+)\W+)*{_GIVE_UP_PHRASE}(\W+({_GIVE_UP_PHRASE}|please))*\W*",
+    re.IGNORECASE,
+)
+
+
+def plan_analysis(user_input: str, previous_quality: Optional[str], min_words: int = 4) -> tuple[Optional[str], str]:
+    """Choose a label without calling the model, if possible.
+
+    Args:
+        user_input: The student's message
+        previous_quality: Label from the previous turn
+        min_words: Replies shorter than this reuse the previous label
+
+    Returns:
+        (label, reason): label is None when analysis should run
+    """
+    if GIVE_UP_RE.fullmatch(user_input.strip()):
+        return "gave_up", "gave_up"
+    if len(user_input.split()) < min_words and previous_quality in ANALYSIS_LABELS:
+        return previous_quality, "short_reply"
+    return None, "analyzed"
@@ -0,0 +1,115 @@
+"""
+Speculative search prefetch between turns.
+
+While the student listens to the tutor's reply the session is idle. The
+prefetcher guesses what the next turn may search for, from the follow-up
+question the tutor just asked and the session topic, and warms the knowledge
+index so a search on the next turn is answered locally instead of waiting on
+Tavily. Each session has a budget of prefetch searches, and pending guesses
+are cancelled as soon as the student's next message arrives.
+"""
+
+import asyncio
+import logging
+import re
+from typing import Optional
+
+from .search import WebSearcher
+from runtime.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+_QUESTION_RE = re.compile(r"[^.!?\n]*\?")
+_WORD_RE = re.compile(r"[A-Za-z0-9][A-Za-z0-9'-]*")
+_FILLER = frozenset(
+    "a about all also an and any are as at be but by can could did do does else explain for from had "
+    "happen happens has have how i if in into is it its just me might more my not now of on or really so "
+    "tell than that the their them then there these they think this those to was we were what when where "
+    "which who why will with would you your you're".split()
+)
+
+
+def guess_queries(tutor_reply: str, topic: Optional[str], max_queries: int = 2) -> list[str]:
+    """Guess likely search queries for the next turn.
+
+    Args:
+        tutor_reply: The tutor's latest reply
+        topic: Current session topic
+        max_queries: Maximum queries to return
+
+    Returns:
+        Queries, most specific first
+    """
+    questions = _QUESTION_RE.findall(tutor_reply)
+    keywords = []
+    for word in _WORD_RE.findall(questions[-1] if questions else ""):
+        word = word.lower()
+        if word not in _FILLER and word not in keywords and (not topic or word not in topic.lower()):
+            keywords.append(word)
+    keywords = " ".join(keywords[:6])
+
+    candidates = [f"{topic} {keywords}".strip() if topic else keywords, topic or ""]
+    queries = []
+    for query in candidates:
+        if query and query not in queries:
+            queries.append(query)
+    return queries[:max_queries]
+
+
+class SearchPrefetcher:
+    """Per-session background warming of the knowledge index."""
+
+    def __init__(self, searcher: Optional[WebSearcher], budget: int = 4, max_queries: int = 2):
+        """Initialize the prefetcher.
+
+        Args:
+            searcher: Shared searcher, or None to disable prefetching
+            budget: Tavily searches this session may spend on prefetching
+            max_queries: Guessed queries per tutor reply
+        """
+        self.searcher = searcher
+        self.budget = budget
+        self.max_queries = max_queries
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        """Whether prefetching can do anything (search and index configured)."""
+        return self.searcher is not None and self.searcher.index is not None
+
+    def schedule(self, tutor_reply: str, topic: Optional[str]) -> None:
+        """Start warming searches for the turn after ``tutor_reply``.
+
+        Replaces any prefetch still running for an earlier reply.
+        """
+        self.cancel()
+        if not self.enabled or self.budget <= 0:
+            return
+        queries = guess_queries(tutor_reply, topic, self.max_queries)
+        if queries:
+            self._task = asyncio.get_running_loop().create_task(self._run(queries, topic))
+
+    def cancel(self) -> None:
+        """Drop pending guesses, e.g. because the next turn has arrived.
+
+        A search already running in a worker thread finishes and still lands
+        in the index; only the remaining queries are abandoned.
+        """
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            metrics.inc("prefetch_cancelled_total")
+        self._task = None
+
+    async def _run(self, queries: list[str], topic: Optional[str]) -> None:
+        for query in queries:
+            if self.budget <= 0:
+                metrics.inc("prefetch_queries_total", result="over_budget")
+                return
+            try:
+                fetched = await asyncio.to_thread(self.searcher.prefetch, query, topic)
+            except Exception as e:
+                logger.warning(f"Prefetch of {query!r} failed: {e}")
+                return
+            if fetched:
+                self.budget -= 1
+            metrics.inc("prefetch_queries_total", result="fetched" if fetched else "cached")
@@ -46,20 +46,34 @@ You MUST first analyze the user's explanation internally, then respond with:
 - If they can't explain it simply, they don't understand it deeply enough"""
 
 
-ANALYSIS_PROMPT = """Based on the user's explanation, assess:
+QUALITY_RUBRIC = """- "correct": accurate and shows the underlying principles
+- "shallow": correct but surface-level
+- "incorrect": contains factual errors or misconceptions
+- "vague": unclear or too imprecise to judge"""
 
-1. **Accuracy**: Is their explanation factually correct?
-2. **Depth**: Do they understand the underlying principles or just surface facts?
-3. **Gaps**: What misconceptions or missing pieces exist?
+
+ANALYSIS_PROMPT = """Classify the user's explanation.
 
 User's explanation: {user_input}
 
 Previous context: {context}
 
-Provide your assessment as JSON:
-{{
-    "accuracy": "correct" | "incorrect" | "partially_correct",
-    "depth": "deep" | "shallow" | "surface",
-    "gaps": ["gap1", "gap2", ...],
-    "quality": "correct" | "incorrect" | "vague" | "shallow"
-}}"""
+Judge accuracy (is it factually correct?) and depth (does it show the underlying principles or just surface facts?), then pick one quality:
+""" + QUALITY_RUBRIC + """
+
+Respond with only this JSON object:
+{{"quality": "correct" | "incorrect" | "vague" | "shallow", "topic": "short name of the concept, e.g. photosynthesis"}}"""
+
+
+BATCH_ANALYSIS_PROMPT = """Classify each numbered explanation below independently. Judge accuracy and depth, then pick one quality:
+""" + QUALITY_RUBRIC + """
+
+{items}
+
+Respond with only this JSON object, one entry per explanation, in order:
+{{"results": [{{"id": 1, "quality": "correct" | "incorrect" | "vague" | "shallow", "topic": "short concept name"}}, ...]}}"""
+
+
+BATCH_ANALYSIS_ITEM = """### Explanation {id}
+Previous context: {context}
+User's explanation: {user_input}"""
@@ -0,0 +1,121 @@
+"""
+Web search with a local knowledge-index cache in front of Tavily.
+"""
+
+import logging
+import threading
+from typing import Optional
+
+from tavily import TavilyClient
+
+from .knowledge import KnowledgeIndex, get_knowledge_index
+from runtime.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def format_results(results: list[dict]) -> str:
+    """Render search results or index chunks for the prompt."""
+    formatted = [
+        f"**{r.get('title', 'No title')}**\n{r.get('text', r.get('content', ''))}\nSource: {r.get('url', '')}"
+        for r in results
+    ]
+    return "\n\n---\n\n".join(formatted) if formatted else "No relevant results found."
+
+
+class WebSearcher:
+    """Tavily search that consults the knowledge index first."""
+
+    def __init__(self, api_key: str, index: Optional[KnowledgeIndex] = None, max_results: int = 3, top_k: int = 4):
+        """Initialize the searcher.
+
+        Args:
+            api_key: Tavily API key
+            index: Shared knowledge index, or None to always query the network
+            max_results: Results requested from Tavily on a miss
+            top_k: Chunks returned to the prompt when the index is used
+        """
+        self.client = TavilyClient(api_key=api_key)
+        self.index = index
+        self.max_results = max_results
+        self.top_k = top_k
+
+    def search(self, query: str, topic: Optional[str] = None) -> str:
+        """Search for ``query``, preferring fresh results from the index.
+
+        Args:
+            query: The search query string
+            topic: Current session topic, used to narrow the index lookup
+
+        Returns:
+            Search results formatted for the prompt
+        """
+        if self.index is not None:
+            hits = self.index.lookup(query, topic, k=self.top_k)
+            if hits:
+                metrics.inc("knowledge_index_lookups_total", result="hit")
+                if any(hit["prefetched"] for hit in hits):
+                    metrics.inc("prefetch_hits_total")
+                return format_results(hits)
+            metrics.inc("knowledge_index_lookups_total", result="miss")
+
+        try:
+            results = self._fetch(query)
+        except Exception as e:
+            logger.error(f"Tavily search failed: {e}")
+            return f"Search failed: {str(e)}"
+
+        if self.index is not None and results:
+            self.index.add(query, results, topic)
+            hits = self.index.lookup(query, topic, k=self.top_k)
+            if hits:
+                return format_results(hits)
+        return format_results(results)
+
+    def prefetch(self, query: str, topic: Optional[str] = None) -> bool:
+        """Warm the index with results for ``query`` if it has none.
+
+        Args:
+            query: The search query string
+            topic: Current session topic
+
+        Returns:
+            True if Tavily was queried, False if the index already had results
+        """
+        if self.index is None or self.index.lookup(query, topic, k=1):
+            return False
+        try:
+            results = self._fetch(query)
+        except Exception as e:
+            logger.warning(f"Tavily prefetch failed: {e}")
+            return True
+        if results:
+            self.index.add(query, results, topic, prefetched=True)
+        return True
+
+    def _fetch(self, query: str) -> list[dict]:
+        response = self.client.search(
+            query=query,
+            search_depth="basic",
+            max_results=self.max_results,
+        )
+        return response.get("results", [])
+
+
+_searcher: Optional[WebSearcher] = None
+_searcher_lock = threading.Lock()
+
+
+def get_web_searcher(settings) -> Optional[WebSearcher]:
+    """Get the process-wide searcher, or None without a Tavily key."""
+    global _searcher
+    if not settings.tavily_api_key:
+        return None
+    with _searcher_lock:
+        if _searcher is None:
+            _searcher = WebSearcher(
+                settings.tavily_api_key,
+                index=get_knowledge_index(settings),
+                top_k=settings.knowledge_top_k,
+            )
+        return _searcher
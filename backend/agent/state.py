@@ -18,7 +18,7 @@ class SessionState(TypedDict, total=False):
     current_topic: Optional[str]
     
     # Quality assessment of the user's explanation
-    explanation_quality: Optional[Literal["correct", "incorrect", "vague", "shallow"]]
+    explanation_quality: Optional[Literal["correct", "incorrect", "vague", "shallow", "gave_up"]]
     
     # AI response text
     response_text: str
@@ -2,7 +2,36 @@
 Audio processing package for The Reverse Tutor.
 """
 
+from .base import (
+    STTBackend,
+    TTSBackend,
+    SpeechEngineError,
+    register_stt,
+    register_tts,
+    create_stt,
+    create_tts,
+    available_stt_engines,
+    available_tts_engines,
+)
 from .stt import DeepgramSTT
 from .tts import EdgeTTS
+from .local import LocalWhisperSTT, LocalPiperTTS
+from .fake import FakeSTT, FakeTTS
 
-__all__ = ["DeepgramSTT", "EdgeTTS"]
+__all__ = [
+    "STTBackend",
+    "TTSBackend",
+    "SpeechEngineError",
+    "register_stt",
+    "register_tts",
+    "create_stt",
+    "create_tts",
+    "available_stt_engines",
+    "available_tts_engines",
+    "DeepgramSTT",
+    "EdgeTTS",
+    "LocalWhisperSTT",
+    "LocalPiperTTS",
+    "FakeSTT",
+    "FakeTTS",
+]
@@ -0,0 +1,128 @@
+"""
+Speech engine interfaces and registry.
+
+STT and TTS engines implement a small async protocol and register a factory
+under a short name. Sessions pick their engines by name (``Settings.stt_engine``
+and ``Settings.tts_engine``) so remote and local backends are interchangeable.
+"""
+
+import logging
+from typing import Callable, Optional, Protocol, runtime_checkable
+
+logger = logging.getLogger(__name__)
+
+
+class SpeechEngineError(Exception):
+    """Raised when a speech engine is unknown or not configured."""
+
+
+@runtime_checkable
+class STTBackend(Protocol):
+    """Speech-to-text engine."""
+
+    name: str
+
+    async def transcribe(self, audio_bytes: bytes, mime_type: str = "audio/webm") -> str:
+        """Transcribe audio bytes to text."""
+        ...
+
+
+@runtime_checkable
+class TTSBackend(Protocol):
+    """Text-to-speech engine.
+
+    Engines may also define ``prewarm()``, called when a session starts, to set
+    up connections before the first synthesis.
+    """
+
+    name: str
+    mime_type: str
+
+    async def synthesize(self, text: str, voice: Optional[str] = None) -> bytes:
+        """Synthesize speech audio for the given text."""
+        ...
+
+
+STTFactory = Callable[..., STTBackend]
+TTSFactory = Callable[..., TTSBackend]
+
+_STT_ENGINES: dict[str, STTFactory] = {}
+_TTS_ENGINES: dict[str, TTSFactory] = {}
+
+
+def register_stt(name: str):
+    """Register an STT engine factory taking ``Settings``.
+
+    Args:
+        name: Engine name used in ``Settings.stt_engine``
+    """
+    def decorator(factory: STTFactory) -> STTFactory:
+        _STT_ENGINES[name] = factory
+        return factory
+    return decorator
+
+
+def register_tts(name: str):
+    """Register a TTS engine factory taking ``Settings``.
+
+    Args:
+        name: Engine name used in ``Settings.tts_engine``
+    """
+    def decorator(factory: TTSFactory) -> TTSFactory:
+        _TTS_ENGINES[name] = factory
+        return factory
+    return decorator
+
+
+def available_stt_engines() -> list[str]:
+    """Names of all registered STT engines."""
+    return sorted(_STT_ENGINES)
+
+
+def available_tts_engines() -> list[str]:
+    """Names of all registered TTS engines."""
+    return sorted(_TTS_ENGINES)
+
+
+def create_stt(settings, name: Optional[str] = None) -> STTBackend:
+    """Instantiate an STT engine.
+
+    Args:
+        settings: Application settings
+        name: Engine name, defaults to ``settings.stt_engine``
+
+    Returns:
+        The STT engine
+
+    Raises:
+        SpeechEngineError: If the engine is unknown or not configured
+    """
+    engine = name or settings.stt_engine
+    factory = _STT_ENGINES.get(engine)
+    if factory is None:
+        raise SpeechEngineError(
+            f"Unknown STT engine '{engine}'. Available: {', '.join(available_stt_engines())}"
+        )
+    return factory(settings)
+
+
+def create_tts(settings, name: Optional[str] = None) -> TTSBackend:
+    """Instantiate a TTS engine.
+
+    Args:
+        settings: Application settings
+        name: Engine name, defaults to ``settings.tts_engine``
+
+    Returns:
+        The TTS engine
+
+    Raises:
+        SpeechEngineError: If the engine is unknown or not configured
+    """
+    engine = name or settings.tts_engine
+    factory = _TTS_ENGINES.get(engine)
+    if factory is None:
+        raise SpeechEngineError(
+            f"Unknown TTS engine '{engine}'. Available: {', '.join(available_tts_engines())}"
+        )
+    return factory(settings)
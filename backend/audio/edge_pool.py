@@ -0,0 +1,260 @@
+"""
+Pooled WebSocket connections to the Edge TTS service.
+
+``edge_tts.Communicate`` opens a fresh WebSocket (TCP + TLS + upgrade) for
+every text chunk it synthesizes. The service accepts several SSML requests on
+one connection, so this module keeps a per-process pool of warm connections
+and speaks the same protocol over them, skipping connection setup before the
+first audio byte. Connections are health-checked on checkout (closed, too old
+or idle too long) and a request that fails before producing audio is retried
+once on a fresh connection.
+"""
+
+import asyncio
+import logging
+import ssl
+import time
+from collections import deque
+from typing import AsyncIterator, Optional
+from xml.sax.saxutils import escape
+
+import aiohttp
+import certifi
+from edge_tts.communicate import (
+    calc_max_mesg_size,
+    connect_id,
+    date_to_string,
+    get_headers_and_data,
+    mkssml,
+    remove_incompatible_characters,
+    split_text_by_byte_length,
+    ssml_headers_plus_data,
+)
+from edge_tts.constants import WSS_URL
+from edge_tts.models import TTSConfig
+
+from runtime.metrics import metrics
+from runtime.tracing import span
+
+logger = logging.getLogger(__name__)
+
+WSS_HEADERS = {
+    "Pragma": "no-cache",
+    "Cache-Control": "no-cache",
+    "Origin": "chrome-extension://jdiccldimpdaibmpdkjnbmckianbfold",
+    "Accept-Encoding": "gzip, deflate, br",
+    "Accept-Language": "en-US,en;q=0.9",
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+    " (KHTML, like Gecko) Chrome/91.0.4472.77 Safari/537.36 Edg/91.0.864.41",
+}
+
+SPEECH_CONFIG = (
+    '{"context":{"synthesis":{"audio":{"metadataoptions":{'
+    '"sentenceBoundaryEnabled":false,"wordBoundaryEnabled":false},'
+    '"outputFormat":"audio-24khz-48kbitrate-mono-mp3"'
+    "}}}}\r\n"
+)
+
+
+class EdgeProtocolError(Exception):
+    """Raised when the service sends something the protocol does not allow."""
+
+
+class EdgeConnection:
+    """One WebSocket to the synthesis service, reusable across requests."""
+
+    def __init__(self, ws: aiohttp.ClientWebSocketResponse):
+        self.ws = ws
+        self.created = time.monotonic()
+        self.last_used = self.created
+        self.requests = 0
+
+    def healthy(self, max_age: float, max_idle: float) -> bool:
+        """Whether the connection can be handed out again."""
+        now = time.monotonic()
+        return (
+            not self.ws.closed
+            and now - self.created < max_age
+            and now - self.last_used < max_idle
+        )
+
+    async def close(self) -> None:
+        """Close the WebSocket."""
+        if not self.ws.closed:
+            await self.ws.close()
+
+    async def request(self, ssml: str) -> AsyncIterator[bytes]:
+        """Send one SSML request and yield its audio until ``turn.end``."""
+        await self.ws.send_str(ssml_headers_plus_data(connect_id(), date_to_string(), ssml))
+        self.requests += 1
+
+        async for received in self.ws:
+            if received.type == aiohttp.WSMsgType.TEXT:
+                encoded = received.data.encode("utf-8")
+                headers, _ = get_headers_and_data(encoded, encoded.find(b"\r\n\r\n"))
+                path = headers.get(b"Path")
+                if path == b"turn.end":
+                    self.last_used = time.monotonic()
+                    return
+                if path not in (b"response", b"turn.start", b"audio.metadata"):
+                    raise EdgeProtocolError(f"Unknown path received: {path!r}")
+            elif received.type == aiohttp.WSMsgType.BINARY:
+                if len(received.data) < 2:
+                    raise EdgeProtocolError("Binary message is missing the header length")
+                header_length = int.from_bytes(received.data[:2], "big")
+                headers, data = get_headers_and_data(received.data, header_length)
+                if headers.get(b"Path") != b"audio":
+                    raise EdgeProtocolError("Binary message with a non-audio path")
+                if data:
+                    yield data
+            elif received.type == aiohttp.WSMsgType.ERROR:
+                raise EdgeProtocolError(f"WebSocket error: {received.data or 'unknown'}")
+
+        raise ConnectionResetError("Edge TTS connection closed mid-request")
+
+
+class EdgeConnectionPool:
+    """Per-process pool of warm Edge TTS connections."""
+
+    def __init__(self, url: str = WSS_URL, max_idle_connections: int = 4, max_idle: float = 30.0,
+                 max_age: float = 600.0, connect_timeout: int = 10, receive_timeout: int = 60):
+        """Initialize the pool.
+
+        Args:
+            url: Service WebSocket URL
+            max_idle_connections: Connections kept open between requests (0 disables reuse)
+            max_idle: Seconds an unused connection stays eligible for reuse
+            max_age: Seconds after which a connection is retired
+            connect_timeout: Socket connect timeout in seconds
+            receive_timeout: Socket read timeout in seconds
+        """
+        self.url = url
+        self.max_idle_connections = max_idle_connections
+        self.max_idle = max_idle
+        self.max_age = max_age
+        self._timeout = aiohttp.ClientTimeout(
+            total=None,
+            sock_connect=connect_timeout,
+            sock_read=receive_timeout,
+        )
+        self._receive_timeout = receive_timeout
+        self._ssl = ssl.create_default_context(cafile=certifi.where())
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._idle: deque[EdgeConnection] = deque()
+        self._warming: Optional[asyncio.Task] = None
+
+    async def _connect(self) -> EdgeConnection:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(trust_env=True, timeout=self._timeout)
+        separator = "&" if "?" in self.url else "?"
+        ws = await self._session.ws_connect(
+            f"{self.url}{separator}ConnectionId={connect_id()}",
+            compress=15,
+            receive_timeout=self._receive_timeout,
+            headers=WSS_HEADERS,
+            ssl=self._ssl,
+        )
+        await ws.send_str(
+            f"X-Timestamp:{date_to_string()}\r\n"
+            "Content-Type:application/json; charset=utf-8\r\n"
+            "Path:speech.config\r\n\r\n"
+            f"{SPEECH_CONFIG}"
+        )
+        return EdgeConnection(ws)
+
+    async def acquire(self) -> EdgeConnection:
+        """Check out a healthy idle connection, or open a new one."""
+        while self._idle:
+            connection = self._idle.pop()
+            if connection.healthy(self.max_age, self.max_idle):
+                metrics.inc("edge_tts_connections_total", result="reused")
+                return connection
+            await connection.close()
+        metrics.inc("edge_tts_connections_total", result="new")
+        return await self._connect()
+
+    async def release(self, connection: EdgeConnection) -> None:
+        """Return a connection after a completed request."""
+        if len(self._idle) < self.max_idle_connections and connection.healthy(self.max_age, self.max_idle):
+            self._idle.append(connection)
+        else:
+            await connection.close()
+
+    def prewarm(self) -> None:
+        """Open a connection in the background if none is idle."""
+        if self.max_idle_connections and not self._idle and (self._warming is None or self._warming.done()):
+            self._warming = asyncio.get_running_loop().create_task(self._warm())
+
+    async def _warm(self) -> None:
+        try:
+            await self.release(await self._connect())
+        except Exception as e:
+            logger.warning(f"Edge TTS prewarm failed: {e}")
+
+    async def stream(self, text: str, voice: str) -> AsyncIterator[bytes]:
+        """Synthesize ``text`` and yield MP3 audio chunks as they arrive.
+
+        Args:
+            text: Text to synthesize
+            voice: Edge voice name (short or long form)
+        """
+        config = TTSConfig(voice, "+0%", "+0%", "+0Hz")
+        parts = split_text_by_byte_length(
+            escape(remove_incompatible_characters(text)),
+            calc_max_mesg_size(config),
+        )
+        for part in parts:
+            ssml = mkssml(config, part)
+            for attempt in range(2):
+                with span("tts:acquire"):
+                    connection = await self.acquire()
+                produced = completed = False
+                try:
+                    async for chunk in connection.request(ssml):
+                        produced = True
+                        yield chunk
+                    completed = True
+                    break
+                except (aiohttp.ClientError, ConnectionError, EdgeProtocolError) as e:
+                    if produced or attempt:
+                        raise
+                    metrics.inc("edge_tts_retries_total")
+                    logger.info(f"Edge TTS connection failed ({e}), reconnecting")
+                finally:
+                    if completed:
+                        await self.release(connection)
+                    else:
+                        await connection.close()
+
+    async def close(self) -> None:
+        """Close all idle connections and the HTTP session."""
+        if self._warming is not None:
+            self._warming.cancel()
+        while self._idle:
+            await self._idle.pop().close()
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+_pool: Optional[EdgeConnectionPool] = None
+
+
+def get_edge_pool(settings) -> EdgeConnectionPool:
+    """Get the process-wide Edge TTS connection pool."""
+    global _pool
+    if _pool is None:
+        _pool = EdgeConnectionPool(
+            url=settings.edge_tts_url or WSS_URL,
+            max_idle_connections=settings.edge_tts_pool_size,
+            max_idle=settings.edge_tts_max_idle_s,
+        )
+    return _pool
+
+
+async def close_edge_pool() -> None:
+    """Close the process-wide pool, if it was created."""
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
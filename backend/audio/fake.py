@@ -0,0 +1,72 @@
+"""
+Fake speech engines for load testing.
+
+They sleep for a configurable latency instead of calling a speech service, so
+a single server process can be driven to saturation without third-party
+rate limits or costs. Select them with ``STT_ENGINE=fake`` / ``TTS_ENGINE=fake``.
+"""
+
+import asyncio
+from typing import Optional
+
+from .base import register_stt, register_tts
+
+FAKE_TRANSCRIPT = (
+    "Photosynthesis is how plants turn sunlight, water and carbon dioxide "
+    "into glucose and oxygen using chlorophyll in their leaves."
+)
+
+
+class FakeSTT:
+    """Speech-to-text stand-in that returns a canned transcript."""
+
+    name = "fake"
+
+    def __init__(self, latency: float = 0.2, transcript: str = FAKE_TRANSCRIPT):
+        """Initialize the fake engine.
+
+        Args:
+            latency: Simulated transcription time in seconds
+            transcript: Text returned for every clip
+        """
+        self.latency = latency
+        self.transcript = transcript
+
+    async def transcribe(self, audio_bytes: bytes, mime_type: str = "audio/webm") -> str:
+        """Return the canned transcript after the simulated latency."""
+        await asyncio.sleep(self.latency)
+        return self.transcript
+
+
+class FakeTTS:
+    """Text-to-speech stand-in that returns zero-filled audio."""
+
+    name = "fake"
+    mime_type = "audio/mp3"
+
+    def __init__(self, latency: float = 0.15, bytes_per_char: int = 160):
+        """Initialize the fake engine.
+
+        Args:
+            latency: Simulated synthesis time in seconds
+            bytes_per_char: Audio size per input character (~48kbps MP3 speech)
+        """
+        self.latency = latency
+        self.bytes_per_char = bytes_per_char
+
+    async def synthesize(self, text: str, voice: Optional[str] = None) -> bytes:
+        """Return placeholder audio sized like real speech for ``text``."""
+        await asyncio.sleep(self.latency)
+        return bytes(len(text) * self.bytes_per_char)
+
+
+@register_stt("fake")
+def create_fake_stt(settings) -> FakeSTT:
+    """Build the fake STT engine from settings."""
+    return FakeSTT(latency=settings.fake_stt_latency_ms / 1000)
+
+
+@register_tts("fake")
+def create_fake_tts(settings) -> FakeTTS:
+    """Build the fake TTS engine from settings."""
+    return FakeTTS(latency=settings.fake_tts_latency_ms / 1000)
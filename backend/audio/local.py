@@ -0,0 +1,184 @@
+"""
+In-process local speech engines.
+
+Runs faster-whisper (STT) and Piper (TTS) on this machine so a turn does not
+need a round trip to a third-party speech service. Inference is CPU-bound, so
+it is executed in a shared process pool to keep the event loop responsive.
+Both libraries are optional dependencies and are only imported in the workers.
+"""
+
+import asyncio
+import io
+import logging
+import multiprocessing
+import wave
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from .base import SpeechEngineError, register_stt, register_tts
+
+logger = logging.getLogger(__name__)
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+# Per-worker model caches (populated lazily inside the pool processes)
+_whisper_models: dict = {}
+_piper_voices: dict = {}
+
+
+def get_speech_executor(max_workers: int = 2) -> ProcessPoolExecutor:
+    """Get the process pool shared by all local speech engines.
+
+    Args:
+        max_workers: Number of worker processes (used on first call only)
+
+    Returns:
+        The shared process pool
+    """
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        logger.info(f"Started local speech pool with {max_workers} workers")
+    return _executor
+
+
+def shutdown_speech_executor() -> None:
+    """Shut down the shared speech process pool, if it was started."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def _whisper_transcribe(model_name: str, compute_type: str, language: str, audio_bytes: bytes) -> str:
+    """Transcribe audio in a worker process with faster-whisper."""
+    key = (model_name, compute_type)
+    model = _whisper_models.get(key)
+    if model is None:
+        from faster_whisper import WhisperModel
+        model = WhisperModel(model_name, device="cpu", compute_type=compute_type)
+        _whisper_models[key] = model
+
+    segments, _ = model.transcribe(
+        io.BytesIO(audio_bytes),
+        language=language,
+        beam_size=1,
+        vad_filter=True,
+    )
+    return " ".join(segment.text.strip() for segment in segments).strip()
+
+
+def _piper_synthesize(model_path: str, text: str) -> bytes:
+    """Synthesize WAV audio in a worker process with Piper."""
+    voice = _piper_voices.get(model_path)
+    if voice is None:
+        from piper.voice import PiperVoice
+        voice = PiperVoice.load(model_path)
+        _piper_voices[model_path] = voice
+
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav_file:
+        # piper-tts >= 1.3 renamed synthesize() to synthesize_wav()
+        if hasattr(voice, "synthesize_wav"):
+            voice.synthesize_wav(text, wav_file)
+        else:
+            voice.synthesize(text, wav_file)
+    return buffer.getvalue()
+
+
+class LocalWhisperSTT:
+    """Speech-to-text using a local faster-whisper model."""
+
+    name = "local"
+
+    def __init__(self, model: str = "base.en", compute_type: str = "int8", language: str = "en", workers: int = 2):
+        """Initialize the local STT engine.
+
+        Args:
+            model: faster-whisper model size or path
+            compute_type: CTranslate2 compute type (e.g. 'int8', 'float32')
+            language: Spoken language code
+            workers: Size of the shared speech process pool
+        """
+        self.model = model
+        self.compute_type = compute_type
+        self.language = language
+        self.workers = workers
+
+    async def transcribe(self, audio_bytes: bytes, mime_type: str = "audio/webm") -> str:
+        """Transcribe audio bytes.
+
+        Args:
+            audio_bytes: Raw audio data (any container ffmpeg/PyAV can decode)
+            mime_type: Audio MIME type (unused, the container is sniffed)
+
+        Returns:
+            Transcribed text
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            get_speech_executor(self.workers),
+            _whisper_transcribe,
+            self.model,
+            self.compute_type,
+            self.language,
+            audio_bytes,
+        )
+
+
+class LocalPiperTTS:
+    """Text-to-speech using a local Piper voice."""
+
+    name = "local"
+    mime_type = "audio/wav"
+
+    def __init__(self, model_path: str, workers: int = 2):
+        """Initialize the local TTS engine.
+
+        Args:
+            model_path: Path to a Piper ``.onnx`` voice model
+            workers: Size of the shared speech process pool
+        """
+        self.model_path = model_path
+        self.workers = workers
+
+    async def synthesize(self, text: str, voice: Optional[str] = None) -> bytes:
+        """Synthesize speech from text using Piper.
+
+        Args:
+            text: Text to synthesize
+            voice: Optional path to a different Piper voice model
+
+        Returns:
+            Audio bytes (WAV format)
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            get_speech_executor(self.workers),
+            _piper_synthesize,
+            voice or self.model_path,
+            text,
+        )
+
+
+@register_stt("local")
+def create_local_stt(settings) -> LocalWhisperSTT:
+    """Build the local faster-whisper engine from settings."""
+    return LocalWhisperSTT(
+        model=settings.local_stt_model,
+        compute_type=settings.local_stt_compute_type,
+        workers=settings.speech_workers,
+    )
+
+
+@register_tts("local")
+def create_local_tts(settings) -> LocalPiperTTS:
+    """Build the local Piper engine from settings."""
+    if not settings.local_tts_model:
+        raise SpeechEngineError(
+            "LOCAL_TTS_MODEL is not configured. Local TTS requires a Piper voice model path."
+        )
+    return LocalPiperTTS(settings.local_tts_model, workers=settings.speech_workers)
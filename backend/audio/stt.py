@@ -9,6 +9,9 @@ import httpx
 
 from deepgram import DeepgramClient
 
+from .base import SpeechEngineError, register_stt
+from runtime.tracing import span
+
 logger = logging.getLogger(__name__)
 
 
@@ -39,12 +42,13 @@ async def transcribe_audio(api_key: str, audio_bytes: bytes, mime_type: str = "a
     
     try:
         async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
-                url,
-                headers=headers,
-                params=params,
-                content=audio_bytes,
-            )
+            with span("stt:http", bytes=len(audio_bytes)):
+                response = await client.post(
+                    url,
+                    headers=headers,
+                    params=params,
+                    content=audio_bytes,
+                )
             
             if response.status_code != 200:
                 logger.error(f"Deepgram API error: {response.status_code} - {response.text}")
@@ -73,6 +77,8 @@ async def transcribe_audio(api_key: str, audio_bytes: bytes, mime_type: str = "a
 class DeepgramSTT:
     """Real-time speech-to-text using Deepgram."""
     
+    name = "deepgram"
+    
     def __init__(self, api_key: str, sample_rate: int = 16000):
         """Initialize Deepgram client.
         
@@ -97,6 +103,16 @@ class DeepgramSTT:
         return await transcribe_audio(self.api_key, audio_bytes, mime_type)
 
 
+@register_stt("deepgram")
+def create_deepgram_stt(settings) -> DeepgramSTT:
+    """Build the Deepgram engine from settings."""
+    if not settings.deepgram_api_key:
+        raise SpeechEngineError(
+            "DEEPGRAM_API_KEY is not configured. Voice input requires this. Please add it to your .env file."
+        )
+    return DeepgramSTT(settings.deepgram_api_key, settings.sample_rate)
+
+
 async def transcribe_file(api_key: str, audio_path: str) -> str:
     """Transcribe an audio file (for testing).
     
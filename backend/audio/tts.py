@@ -7,22 +7,57 @@ Uses edge-tts (Microsoft Edge's online TTS service) as a lightweight, high-quali
 import asyncio
 import logging
 import io
+from typing import AsyncIterator, Optional
 import edge_tts
 
+from .base import register_tts
+from .edge_pool import EdgeConnectionPool, get_edge_pool
+
 logger = logging.getLogger(__name__)
 
 class EdgeTTS:
     """Text-to-speech using Microsoft Edge TTS."""
     
-    def __init__(self, voice: str = "en-US-ChristopherNeural"):
+    name = "edge"
+    mime_type = "audio/mp3"
+    
+    def __init__(self, voice: str = "en-US-ChristopherNeural", pool: Optional[EdgeConnectionPool] = None):
         """Initialize TTS engine.
         
         Args:
             voice: The Edge TTS voice to use.
+            pool: Optional shared connection pool; without it every call opens a new connection.
         """
         self.default_voice = voice
+        self.pool = pool
         logger.info(f"Initialized EdgeTTS with voice: {self.default_voice}")
     
+    def prewarm(self) -> None:
+        """Open a pooled connection in the background ahead of the first synthesis."""
+        if self.pool is not None:
+            self.pool.prewarm()
+    
+    async def stream(self, text: str, voice: str = None) -> AsyncIterator[bytes]:
+        """Stream synthesized audio chunks as they arrive.
+        
+        Args:
+            text: Text to synthesize
+            voice: Optional override for the voice
+            
+        Yields:
+            Audio chunks (MP3 format)
+        """
+        target_voice = voice or self.default_voice
+        if self.pool is not None:
+            async for chunk in self.pool.stream(text, target_voice):
+                yield chunk
+            return
+        
+        communicate = edge_tts.Communicate(text, target_voice)
+        async for chunk in communicate.stream():
+            if chunk["type"] == "audio":
+                yield chunk["data"]
+    
     async def synthesize(self, text: str, voice: str = None) -> bytes:
         """Synthesize speech from text using Edge TTS.
         
@@ -33,17 +68,20 @@ class EdgeTTS:
         Returns:
             Audio bytes (MP3 format)
         """
-        target_voice = voice or self.default_voice
-        communicate = edge_tts.Communicate(text, target_voice)
-        
         # Capture audio to memory
         audio_stream = io.BytesIO()
-        async for chunk in communicate.stream():
-            if chunk["type"] == "audio":
-                audio_stream.write(chunk["data"])
+        async for chunk in self.stream(text, voice):
+            audio_stream.write(chunk)
         
         return audio_stream.getvalue()
 
+
+@register_tts("edge")
+def create_edge_tts(settings) -> EdgeTTS:
+    """Build the Edge TTS engine from settings."""
+    pool = get_edge_pool(settings) if settings.edge_tts_pool_size > 0 else None
+    return EdgeTTS(voice=settings.tts_voice, pool=pool)
+
 # Quick test
 async def test_tts():
     """Test TTS synthesis."""
@@ -20,18 +20,84 @@ class Settings(BaseSettings):
     tavily_api_key: str = ""
     
     # LLM Configuration
-    llm_provider: str = "groq"  # "groq" or "openai"
+    llm_provider: str = "groq"  # "groq", "openai" or "fake" (load testing)
     groq_model: str = "llama-3.3-70b-versatile"
     openai_model: str = "gpt-4o"
     
+    # Per-node model overrides (empty provider/model = inherit from above;
+    # the analyze node defaults to a small model for the provider)
+    analyze_provider: str = ""
+    analyze_model: str = ""
+    analyze_temperature: float = 0.0
+    analyze_max_tokens: int = 48  # The JSON label + topic is ~15 tokens
+    respond_provider: str = ""
+    respond_model: str = ""
+    respond_temperature: float = 0.7
+    respond_max_tokens: int = 1024
+    
+    # Adaptive analysis: skip the classifier for give-ups and very short replies
+    analysis_skip_enabled: bool = True
+    analysis_min_words: int = 4
+    
+    # Cross-session micro-batching of analysis calls
+    analysis_batching: bool = False
+    analysis_batch_window_ms: int = 50  # Max wait for more requests after the first
+    analysis_batch_max: int = 16  # Max requests per LLM call
+    
+    # Knowledge Index (cross-session cache of web search results)
+    knowledge_index_enabled: bool = True
+    knowledge_index_dir: str = str(PROJECT_ROOT / "data" / "knowledge")
+    knowledge_ttl_hours: float = 72.0  # Re-query Tavily once stored results are older than this
+    knowledge_min_similarity: float = 0.6  # Query similarity needed for an index hit
+    knowledge_prefetch_min_similarity: float = 0.25  # Guessed-query similarity before prefetched results are considered
+    knowledge_chunk_min_similarity: float = 0.3  # Chunk similarity needed for a hit on prefetched results
+    knowledge_top_k: int = 4  # Chunks added to the prompt per search
+    knowledge_chunk_chars: int = 500
+    
+    # Speculative search prefetch while the student listens to the reply
+    prefetch_enabled: bool = False
+    prefetch_max_queries: int = 2  # Guessed queries per tutor reply
+    prefetch_budget: int = 4  # Tavily searches a session may spend on prefetching
+    
     # Server Configuration
     host: str = "0.0.0.0"
     port: int = 8000
+    ws_per_message_deflate: bool = True  # Accept permessage-deflate when clients offer it
     debug: bool = True
     
     # Audio Configuration
     sample_rate: int = 16000
     
+    # Speech Engines
+    stt_engine: str = "deepgram"  # "deepgram", "local" or "fake"
+    tts_engine: str = "edge"  # "edge", "local" or "fake"
+    tts_voice: str = "en-US-ChristopherNeural"
+    edge_tts_url: str = ""  # Override the Edge TTS WebSocket URL (e.g. a local fake server)
+    edge_tts_pool_size: int = 4  # Warm Edge TTS connections kept per process (0 disables pooling)
+    edge_tts_max_idle_s: float = 30.0  # Idle connections older than this are reconnected
+    local_stt_model: str = "base.en"  # faster-whisper model size or path
+    local_stt_compute_type: str = "int8"
+    local_tts_model: str = ""  # Path to a Piper .onnx voice
+    speech_workers: int = 2  # Process pool size for local engines
+    speech_engine_overrides: str = ""  # Comma-separated engines clients may pick with ?stt= / ?tts= (e.g. "edge,local")
+    
+    # Runtime / Performance
+    offload_threshold_bytes: int = 65536  # Buffers this large are processed off the event loop
+    cpu_workers: int = 4  # Processes in the shared CPU pool (large JSON payloads)
+    loop_monitor_interval_ms: int = 100
+    slow_callback_ms: int = 100  # Log event-loop stalls longer than this
+    
+    # Tracing (Chrome trace-event JSON, served at /debug/traces)
+    trace_sample_rate: float = 0.0  # Fraction of sessions traced
+    trace_allow_force: bool = False  # Let clients force tracing with ?trace=1
+    trace_dir: str = ""  # Also write finished traces here
+    trace_keep: int = 50  # Finished traces kept in memory
+    
+    # Fake providers (load testing)
+    fake_llm_latency_ms: int = 300
+    fake_stt_latency_ms: int = 200
+    fake_tts_latency_ms: int = 150
+    
     class Config:
         env_file = str(PROJECT_ROOT / ".env")
         env_file_encoding = "utf-8"
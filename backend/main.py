@@ -2,17 +2,35 @@
 The Reverse Tutor - FastAPI Application Entry Point
 """
 
-import base64
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+import asyncio
 import logging
+from typing import Optional
 
 from config import get_settings
 from agent.graph import create_tutor_graph
+from agent.llm import node_config
+from agent.prefetch import SearchPrefetcher
+from agent.search import get_web_searcher
 from agent.state import SessionState
-from audio.stt import transcribe_audio
-from audio.tts import EdgeTTS
+from audio import SpeechEngineError, create_stt, create_tts
+from audio.local import shutdown_speech_executor
+from audio.edge_pool import close_edge_pool
+from runtime import (
+    LoopLagMonitor,
+    configure_offload,
+    configure_tracing,
+    finish_trace,
+    metrics,
+    offload,
+    shutdown_cpu_executor,
+    stage,
+    start_trace,
+)
+from runtime.tracing import get_trace, load_trace_file, recent_traces
+from runtime.wire import Wire, negotiate_wire
 
 
 logging.basicConfig(level=logging.INFO)
@@ -23,7 +41,19 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     """Application lifespan handler."""
     logger.info("🎓 The Reverse Tutor starting up...")
+    settings = get_settings()
+    configure_offload(settings.offload_threshold_bytes, settings.cpu_workers)
+    configure_tracing(settings.trace_sample_rate, settings.trace_dir, settings.trace_keep)
+    loop_monitor = LoopLagMonitor(
+        interval=settings.loop_monitor_interval_ms / 1000,
+        slow_threshold=settings.slow_callback_ms / 1000,
+    )
+    loop_monitor.start()
     yield
+    await loop_monitor.stop()
+    shutdown_cpu_executor()
+    shutdown_speech_executor()
+    await close_edge_pool()
     logger.info("👋 The Reverse Tutor shutting down...")
 
 
@@ -50,52 +80,129 @@ async def health_check():
     return {"status": "healthy", "service": "The Reverse Tutor"}
 
 
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Process metrics (event-loop lag, offloads, ...) as JSON."""
+    return metrics.snapshot()
+
+
+@app.get("/debug/traces")
+async def list_traces():
+    """Recently finished session traces."""
+    return [trace.summary() for trace in recent_traces()]
+
+
+@app.get("/debug/traces/{trace_id}")
+async def trace_endpoint(trace_id: str):
+    """One session trace as Chrome trace-event JSON (open in ui.perfetto.dev)."""
+    trace = get_trace(trace_id)
+    if trace is not None:
+        return trace.to_chrome()
+    data = await asyncio.to_thread(load_trace_file, trace_id)
+    if data is None:
+        raise HTTPException(status_code=404, detail="Trace not found")
+    return data
+
+
+async def send_frame(websocket: WebSocket, wire: Wire, payload: dict, size_hint: int = 0):
+    """Send a frame in the session's wire format, serializing large payloads off the event loop."""
+    with stage("send"):
+        frame = await wire.encode(payload, size_hint)
+        if wire.binary:
+            metrics.inc("ws_bytes_sent_total", len(frame), wire=wire.name)
+            await websocket.send_bytes(frame)
+        else:
+            # isascii() is a flag check, so large base64 audio frames are not re-encoded
+            size = len(frame) if frame.isascii() else len(frame.encode("utf-8"))
+            metrics.inc("ws_bytes_sent_total", size, wire=wire.name)
+            await websocket.send_text(frame)
+
+
+def requested_engine(settings, websocket: WebSocket, kind: str) -> Optional[str]:
+    """The engine a client asked for with ``?stt=`` / ``?tts=``, if it may pick it.
+
+    Raises:
+        SpeechEngineError: If the engine is not in SPEECH_ENGINE_OVERRIDES
+    """
+    name = websocket.query_params.get(kind)
+    if not name:
+        return None
+    allowed = {engine.strip() for engine in settings.speech_engine_overrides.split(",") if engine.strip()}
+    if name not in allowed:
+        raise SpeechEngineError(f"{kind.upper()} engine '{name}' cannot be selected per session")
+    return name
+
+
 @app.websocket("/ws/session")
 async def websocket_session(websocket: WebSocket):
     """WebSocket endpoint for real-time tutoring sessions."""
-    await websocket.accept()
-    logger.info("New tutoring session connected")
+    # JSON by default; MessagePack when the client offers its subprotocol
+    wire, subprotocol = negotiate_wire(websocket.scope.get("subprotocols", []))
+    await websocket.accept(subprotocol=subprotocol)
+    logger.info(f"New tutoring session connected (wire={wire.name})")
     
     settings = get_settings()
     
-    # Check for required API keys
-    if settings.llm_provider == "groq" and not settings.groq_api_key:
-        await websocket.send_json({
+    # Check for required API keys (each graph node may use its own provider)
+    providers = {node_config(settings, node).provider for node in ("analyze", "respond")}
+    if "groq" in providers and not settings.groq_api_key:
+        await send_frame(websocket, wire, {
             "type": "error",
             "text": "GROQ_API_KEY is not configured. Please add it to your .env file.",
         })
         await websocket.close(code=1008, reason="Missing API key")
         return
-    elif settings.llm_provider == "openai" and not settings.openai_api_key:
-        await websocket.send_json({
+    elif "openai" in providers and not settings.openai_api_key:
+        await send_frame(websocket, wire, {
             "type": "error",
             "text": "OPENAI_API_KEY is not configured. Please add it to your .env file.",
         })
         await websocket.close(code=1008, reason="Missing API key")
         return
     
-    # Check for Deepgram API key for audio transcription
-    if not settings.deepgram_api_key:
-        await websocket.send_json({
+    # Initialize speech engines (query params can pick allowlisted engines)
+    try:
+        stt = create_stt(settings, requested_engine(settings, websocket, "stt"))
+        tts = create_tts(settings, requested_engine(settings, websocket, "tts"))
+    except SpeechEngineError as e:
+        await send_frame(websocket, wire, {
             "type": "error",
-            "text": "DEEPGRAM_API_KEY is not configured. Voice input requires this. Please add it to your .env file.",
+            "text": str(e),
         })
-        await websocket.close(code=1008, reason="Missing Deepgram API key")
+        await websocket.close(code=1008, reason="Speech engine not configured")
         return
+    logger.info(f"Speech engines: stt={stt.name}, tts={tts.name}")
+    
+    # Open a TTS connection while the student is still talking
+    prewarm = getattr(tts, "prewarm", None)
+    if prewarm is not None:
+        prewarm()
     
     try:
         graph = create_tutor_graph(settings)
     except Exception as e:
         logger.error(f"Failed to create tutor graph: {e}")
-        await websocket.send_json({
+        await send_frame(websocket, wire, {
             "type": "error",
             "text": f"Failed to initialize: {str(e)}",
         })
         await websocket.close(code=1011, reason="Initialization failed")
         return
     
-    # Initialize TTS engine
-    tts = EdgeTTS()
+    # Warms likely searches while the student listens to each reply
+    prefetcher = SearchPrefetcher(
+        get_web_searcher(settings) if settings.prefetch_enabled else None,
+        budget=settings.prefetch_budget,
+        max_queries=settings.prefetch_max_queries,
+    )
+    
+    # Record per-turn spans for sampled sessions
+    trace = start_trace(
+        "ws_session",
+        force=settings.trace_allow_force and websocket.query_params.get("trace") == "1",
+    )
+    if trace is not None:
+        logger.info(f"Tracing session as {trace.id}")
     
     # Initialize session state
     state: SessionState = {
@@ -108,49 +215,58 @@ async def websocket_session(websocket: WebSocket):
     try:
         while True:
             # Receive user input (text or audio)
-            data = await websocket.receive_json()
+            message = await (websocket.receive_bytes() if wire.binary else websocket.receive_text())
+            prefetcher.cancel()
+            if trace is not None:
+                trace.next_turn()
+            with stage("receive"):
+                data = await wire.decode(message)
             
             # Handle audio input
             if data.get("type") == "audio":
-                audio_base64 = data.get("audio", "")
-                if not audio_base64:
+                audio = data.get("audio", "")
+                if not audio:
                     continue
                 
-                # Decode base64 audio
+                # Decode base64 audio (binary wire formats carry raw bytes)
                 try:
-                    audio_bytes = base64.b64decode(audio_base64)
+                    if isinstance(audio, bytes):
+                        audio_bytes = audio
+                    else:
+                        with stage("b64_decode"):
+                            audio_bytes = await offload.b64decode(audio)
                 except Exception as e:
                     logger.error(f"Failed to decode audio: {e}")
-                    await websocket.send_json({
+                    await send_frame(websocket, wire, {
                         "type": "error",
                         "text": "Failed to decode audio data",
                     })
                     continue
                 
-                # Transcribe with Deepgram
+                # Transcribe with the session's STT engine
                 try:
-                    user_input = await transcribe_audio(
-                        settings.deepgram_api_key,
-                        audio_bytes,
-                        mime_type=data.get("mimeType", "audio/webm")
-                    )
+                    with stage("stt"):
+                        user_input = await stt.transcribe(
+                            audio_bytes,
+                            mime_type=data.get("mimeType", "audio/webm")
+                        )
                     
                     if not user_input or not user_input.strip():
-                        await websocket.send_json({
+                        await send_frame(websocket, wire, {
                             "type": "error",
                             "text": "Could not understand audio. Please try speaking again.",
                         })
                         continue
                     
                     # Send transcript to frontend
-                    await websocket.send_json({
+                    await send_frame(websocket, wire, {
                         "type": "transcript",
                         "text": user_input,
                     })
                     
                 except Exception as e:
                     logger.error(f"Transcription failed: {e}")
-                    await websocket.send_json({
+                    await send_frame(websocket, wire, {
                         "type": "error",
                         "text": f"Transcription failed: {str(e)}",
                     })
@@ -163,10 +279,11 @@ async def websocket_session(websocket: WebSocket):
                     continue
             
             # Run the LangGraph agent
-            result = await graph.ainvoke({
-                **state,
-                "user_input": user_input,
-            })
+            with stage("graph"):
+                result = await graph.ainvoke({
+                    **state,
+                    "user_input": user_input,
+                })
             
             # Update state
             state = {
@@ -178,22 +295,28 @@ async def websocket_session(websocket: WebSocket):
             
             # Send response back
             response_text = result.get("response_text", "")
-            await websocket.send_json({
+            await send_frame(websocket, wire, {
                 "type": "response",
                 "text": response_text,
                 "quality": result.get("explanation_quality", "unknown"),
                 "turn": state["turn_count"],
-            })
+            }, size_hint=len(response_text))
+            prefetcher.schedule(response_text, state["current_topic"])
             
             # Synthesize and send TTS audio
             try:
-                audio_bytes = await tts.synthesize(response_text)
-                audio_base64 = base64.b64encode(audio_bytes).decode('utf-8')
-                await websocket.send_json({
+                with stage("tts"):
+                    audio_bytes = await tts.synthesize(response_text)
+                if wire.binary:
+                    audio = audio_bytes
+                else:
+                    with stage("b64_encode"):
+                        audio = await offload.b64encode(audio_bytes)
+                await send_frame(websocket, wire, {
                     "type": "audio",
-                    "audio": audio_base64,
-                    "mimeType": "audio/mp3",
-                })
+                    "audio": audio,
+                    "mimeType": tts.mime_type,
+                }, size_hint=len(audio))
             except Exception as e:
                 logger.warning(f"TTS failed, continuing without audio: {e}")
             
@@ -202,6 +325,10 @@ async def websocket_session(websocket: WebSocket):
     except Exception as e:
         logger.error(f"Session error: {e}")
         await websocket.close(code=1011, reason=str(e))
+    finally:
+        prefetcher.cancel()
+        if trace is not None:
+            await asyncio.to_thread(finish_trace, trace)
 
 
 @app.post("/api/chat")
@@ -236,4 +363,5 @@ if __name__ == "__main__":
         host=settings.host,
         port=settings.port,
         reload=settings.debug,
+        ws_per_message_deflate=settings.ws_per_message_deflate,
     )
@@ -0,0 +1,23 @@
+"""
+Runtime support for The Reverse Tutor: metrics, CPU offloading, loop monitoring and tracing.
+"""
+
+from .metrics import metrics, MetricsRegistry
+from .offload import run_cpu, configure_offload, shutdown_cpu_executor
+from .loop_monitor import LoopLagMonitor, stage
+from .tracing import configure_tracing, current_trace, finish_trace, span, start_trace
+
+__all__ = [
+    "metrics",
+    "MetricsRegistry",
+    "run_cpu",
+    "configure_offload",
+    "shutdown_cpu_executor",
+    "LoopLagMonitor",
+    "stage",
+    "configure_tracing",
+    "current_trace",
+    "finish_trace",
+    "span",
+    "start_trace",
+]
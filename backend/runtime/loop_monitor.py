@@ -0,0 +1,151 @@
+"""
+Event-loop lag monitoring.
+
+A background task sleeps for a fixed interval and measures how late it wakes
+up; the overshoot is time the loop spent running someone else's callback.
+A watchdog thread also probes the loop with ``call_soon_threadsafe``; while a
+probe is waiting it samples the loop's running task, and a stall is blamed on
+that task's innermost ``stage()``. Only public asyncio APIs are used, so this
+works the same under uvloop. A session awaiting network I/O inside
+``stage("graph")`` is never blamed, since its task is not the one running.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from .metrics import metrics
+from .tracing import span
+
+logger = logging.getLogger(__name__)
+
+LAG_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# Stages open in the current context, and the same per task for the watchdog
+# thread, which cannot read another thread's context
+_stages: ContextVar[tuple[str, ...]] = ContextVar("loop_stages", default=())
+_task_stages: "weakref.WeakKeyDictionary[asyncio.Task, tuple[str, ...]]" = weakref.WeakKeyDictionary()
+
+
+def _current_task() -> Optional[asyncio.Task]:
+    try:
+        return asyncio.current_task()
+    except RuntimeError:
+        return None
+
+
+@contextmanager
+def stage(name: str):
+    """Mark a section of request handling for lag attribution and tracing.
+
+    Args:
+        name: Stage name (e.g. 'b64_decode', 'stt', 'graph')
+    """
+    outer = _stages.get()
+    token = _stages.set(outer + (name,))
+    task = _current_task()
+    if task is not None:
+        _task_stages[task] = outer + (name,)
+    try:
+        with span(name):
+            yield
+    finally:
+        _stages.reset(token)
+        if task is not None:
+            if outer:
+                _task_stages[task] = outer
+            else:
+                _task_stages.pop(task, None)
+
+
+class _StallWatchdog:
+    """Thread that detects loop stalls and blames them on the running task's stage."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, threshold: float, interval: float):
+        self.loop = loop
+        self.threshold = threshold
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="loop-watchdog", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join(timeout=1.0)
+
+    def _sample(self) -> str:
+        task = asyncio.current_task(self.loop)
+        stages = _task_stages.get(task, ()) if task is not None else ()
+        return stages[-1] if stages else "unknown"
+
+    def _run(self) -> None:
+        poll = min(self.threshold / 2, 0.05)
+        while not self._stop.wait(self.interval):
+            answered = threading.Event()
+            started = time.perf_counter()
+            try:
+                self.loop.call_soon_threadsafe(answered.set)
+            except RuntimeError:
+                return  # Loop closed
+            sampled = {}
+            while not answered.wait(poll):
+                if self._stop.is_set():
+                    return
+                sampled[self._sample()] = None
+            elapsed = time.perf_counter() - started
+            if elapsed >= self.threshold:
+                blamed = ",".join(sampled) or "unknown"
+                metrics.inc("event_loop_slow_callbacks_total", stage=blamed)
+                logger.warning(f"Event loop blocked for {elapsed * 1000:.1f}ms in stage(s): {blamed}")
+
+
+class LoopLagMonitor:
+    """Samples event-loop lag into a histogram and logs slow callbacks."""
+
+    def __init__(self, interval: float = 0.1, slow_threshold: float = 0.1):
+        """Initialize the monitor.
+
+        Args:
+            interval: Seconds between samples
+            slow_threshold: Lag in seconds above which a callback is logged as slow
+        """
+        self.interval = interval
+        self.slow_threshold = slow_threshold
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[_StallWatchdog] = None
+
+    def start(self) -> None:
+        """Start sampling on the running loop."""
+        if self._task is None:
+            loop = asyncio.get_running_loop()
+            self._watchdog = _StallWatchdog(loop, self.slow_threshold, self.interval)
+            self._watchdog.start()
+            self._task = loop.create_task(self._run())
+            logger.info(f"Event-loop lag monitor started (interval={self.interval * 1000:.0f}ms)")
+
+    async def stop(self) -> None:
+        """Stop sampling."""
+        if self._watchdog is not None:
+            self._watchdog.stop()
+            self._watchdog = None
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.perf_counter() - started - self.interval)
+            metrics.observe("event_loop_lag_seconds", lag, buckets=LAG_BUCKETS)
@@ -0,0 +1,126 @@
+"""
+In-process metrics registry.
+
+Counters and bucketed histograms keyed by name and labels, safe to update
+from the event loop and from executor threads. Exposed as JSON at /metrics.
+"""
+
+import bisect
+import math
+import threading
+from typing import Iterable
+
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+
+def _key(name: str, labels: dict) -> str:
+    """Render a metric key like ``name{a=1,b=2}``."""
+    if not labels:
+        return name
+    rendered = ",".join(f"{k}={v}" for k, v in sorted(labels.items()))
+    return f"{name}{{{rendered}}}"
+
+
+class Histogram:
+    """Cumulative bucketed histogram with percentile estimates."""
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        """Record one observation."""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, q: float) -> float:
+        """Estimate the q-th percentile (0-100) as the upper bound of its bucket."""
+        if not self.count:
+            return 0.0
+        rank = math.ceil(self.count * q / 100)
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return min(self.buckets[i], self.max) if i < len(self.buckets) else self.max
+        return self.max
+
+    def snapshot(self) -> dict:
+        """Summarize the histogram."""
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "mean": round(self.sum / self.count, 6) if self.count else 0.0,
+            "max": round(self.max, 6),
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "buckets": {
+                **{str(b): n for b, n in zip(self.buckets, self.counts)},
+                "+Inf": self.counts[-1],
+            },
+        }
+
+
+class MetricsRegistry:
+    """Thread-safe collection of counters and histograms."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: dict[str, float] = {}
+        self._histograms: dict[str, Histogram] = {}
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        """Increment a counter.
+
+        Args:
+            name: Metric name
+            value: Amount to add
+            **labels: Label values
+        """
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, buckets: Iterable[float] = DEFAULT_BUCKETS, **labels) -> None:
+        """Record a histogram observation.
+
+        Args:
+            name: Metric name
+            value: Observed value
+            buckets: Bucket upper bounds, used when the histogram is created
+            **labels: Label values
+        """
+        key = _key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def snapshot(self) -> dict:
+        """Return all metrics as plain data."""
+        with self._lock:
+            return {
+                "counters": dict(self._counters),
+                "histograms": {k: h.snapshot() for k, h in self._histograms.items()},
+            }
+
+    def reset(self) -> None:
+        """Drop all recorded metrics."""
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+
+# Process-wide registry
+metrics = MetricsRegistry()
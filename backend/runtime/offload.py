@@ -0,0 +1,242 @@
+"""
+Offloading of CPU-bound work from the event loop.
+
+Base64 coding, JSON (de)serialization and regex post-processing of large
+buffers are cheap for small inputs but can stall the loop for hundreds of
+milliseconds on multi-megabyte audio frames. These are single C calls that
+hold the GIL, so a thread pool does not help. Helpers here run inline below a
+size threshold. Above it, base64 is coded in bounded slices that yield to the
+loop in between, and everything else runs in a shared process pool.
+"""
+
+import asyncio
+import base64
+import binascii
+import json
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional, TypeVar
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+DEFAULT_THRESHOLD_BYTES = 64 * 1024
+
+# Base64 text coded per slice between yields (~1ms of work); multiple of 4 and 3
+SLICE_CHARS = 256 * 1024
+SLICE_BYTES = SLICE_CHARS // 4 * 3
+
+_executor: Optional[ProcessPoolExecutor] = None
+_threshold_bytes = DEFAULT_THRESHOLD_BYTES
+_max_workers = 4
+
+
+def configure_offload(threshold_bytes: int = DEFAULT_THRESHOLD_BYTES, max_workers: int = 4) -> None:
+    """Set the offload threshold and executor size.
+
+    Args:
+        threshold_bytes: Inputs at least this large are sliced or run in the executor
+        max_workers: Process count for the shared executor (applied on creation)
+    """
+    global _threshold_bytes, _max_workers
+    _threshold_bytes = threshold_bytes
+    _max_workers = max_workers
+
+
+def get_cpu_executor() -> ProcessPoolExecutor:
+    """Get the shared process pool for CPU-bound work."""
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=_max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _executor
+
+
+def shutdown_cpu_executor() -> None:
+    """Shut down the shared executor, if it was started."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+async def run_cpu(op: str, func: Callable[..., T], *args, size: int = 0, **kwargs) -> T:
+    """Run ``func`` inline or in the shared process pool depending on input size.
+
+    ``func`` and its arguments must be picklable (module-level functions).
+
+    Args:
+        op: Operation name for metrics
+        func: Callable to run
+        *args: Positional arguments for ``func``
+        size: Input size in bytes used to decide whether to offload
+        **kwargs: Keyword arguments for ``func``
+
+    Returns:
+        The return value of ``func``
+    """
+    if size < _threshold_bytes:
+        return func(*args, **kwargs)
+    metrics.inc("offload_total", op=op)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_cpu_executor(), partial(func, *args, **kwargs))
+
+
+def _json_dumps(data: Any) -> str:
+    # Same encoding as Starlette's WebSocket.send_json
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+
+async def b64decode(data: str) -> bytes:
+    """Decode base64 text, in slices that yield to the loop for large inputs."""
+    if len(data) < _threshold_bytes:
+        return base64.b64decode(data)
+    metrics.inc("offload_total", op="b64decode")
+    if any(data.find(c, 0, SLICE_CHARS) >= 0 for c in " \r\n\t"):
+        # Line-wrapped input: whitespace would shift slices off 4-character groups
+        data = "".join(data.split())
+    parts = []
+    for start in range(0, len(data), SLICE_CHARS):
+        try:
+            parts.append(base64.b64decode(data[start:start + SLICE_CHARS]))
+        except binascii.Error:
+            # Unpadded or malformed input: decode the remainder in one go
+            parts.append(base64.b64decode(data[start:]))
+            break
+        await asyncio.sleep(0)
+    return b"".join(parts)
+
+
+async def b64encode(data: bytes) -> str:
+    """Encode bytes as base64 text, in slices that yield to the loop for large inputs."""
+    if len(data) < _threshold_bytes:
+        return base64.b64encode(data).decode("utf-8")
+    metrics.inc("offload_total", op="b64encode")
+    view = memoryview(data)
+    parts = []
+    for start in range(0, len(data), SLICE_BYTES):
+        parts.append(base64.b64encode(view[start:start + SLICE_BYTES]).decode("ascii"))
+        await asyncio.sleep(0)
+    return "".join(parts)
+
+
+async def dumps(data: Any, size_hint: int = 0) -> str:
+    """Serialize to JSON without stalling the loop on large string fields.
+
+    Top-level string fields that need no JSON escaping (e.g. base64 audio) are
+    checked in slices and spliced into the encoded frame, so only the small
+    remainder goes through ``json.dumps``. Other large payloads run in the
+    process pool.
+
+    Args:
+        data: JSON-serializable object
+        size_hint: Approximate encoded size (e.g. length of the largest field)
+
+    Returns:
+        JSON text
+    """
+    if size_hint < _threshold_bytes:
+        return _json_dumps(data)
+    if isinstance(data, dict):
+        spliced = {}
+        for key, value in data.items():
+            if isinstance(value, str) and len(value) >= _threshold_bytes and await _is_json_safe(value):
+                spliced[key] = value
+        if spliced:
+            metrics.inc("offload_total", op="json_dumps_splice")
+            markers = {key: f"\x00{i}" for i, key in enumerate(spliced)}
+            text = _json_dumps({**data, **markers})
+            parts = []
+            for key, marker in markers.items():
+                head, text = text.split(_json_dumps(marker), 1)
+                parts += [head, '"', spliced[key], '"']
+            parts.append(text)
+            return "".join(parts)
+    return await run_cpu("json_dumps", _json_dumps, data, size=size_hint)
+
+
+async def loads(text: str) -> Any:
+    """Parse JSON text without stalling the loop on large string fields.
+
+    Long string literals without escapes (e.g. base64 audio) are cut out with
+    ``str.find`` and reinserted after parsing the small remainder. Only values
+    of a top-level object are reinserted; anything else (nested values, keys,
+    arrays) runs in the process pool, as do other large inputs.
+    """
+    if len(text) < _threshold_bytes:
+        return json.loads(text)
+    extracted = _extract_long_strings(text)
+    if extracted is not None:
+        skeleton, values = extracted
+        data = json.loads(skeleton)
+        if isinstance(data, dict):
+            restored = {
+                key: values[value] if isinstance(value, str) and value in values else value
+                for key, value in data.items()
+            }
+            used = sum(1 for value in data.values() if isinstance(value, str) and value in values)
+            if used == len(values):
+                metrics.inc("offload_total", op="json_loads_splice")
+                return restored
+    return await run_cpu("json_loads", json.loads, text, size=len(text))
+
+
+async def _is_json_safe(value: str) -> bool:
+    """Whether ``value`` encodes to JSON as itself, checked in slices."""
+    if not value.isascii() or value.find('"') >= 0 or value.find("\\") >= 0:
+        return False
+    for start in range(0, len(value), SLICE_CHARS):
+        # Printable ASCII has no control characters to escape
+        if not value[start:start + SLICE_CHARS].isprintable():
+            return False
+        await asyncio.sleep(0)
+    return True
+
+
+def _extract_long_strings(text: str, max_strings: int = 64) -> Optional[tuple[str, dict[str, str]]]:
+    """Replace long escape-free string literals with short markers.
+
+    Returns:
+        (skeleton, values by marker), or None if nothing was extracted, the
+        input has too many strings to scan cheaply, or it already contains
+        text that could be mistaken for a marker
+    """
+    parts, values = [], {}
+    position = 0
+    for _ in range(max_strings):
+        start = text.find('"', position)
+        if start < 0:
+            break
+        end = text.find('"', start + 1)
+        while end > 0 and text[end - 1] == "\\":
+            # Escaped quote unless the backslash is itself escaped
+            backslashes = len(text[start + 1:end]) - len(text[start + 1:end].rstrip("\\"))
+            if backslashes % 2 == 0:
+                break
+            end = text.find('"', end + 1)
+        if end < 0:
+            return None
+        if end - start > _threshold_bytes and text.find("\\", start, end) < 0:
+            marker = f"\x00{len(values)}"
+            values[marker] = text[start + 1:end]
+            parts += [text[position:start], _json_dumps(marker)]
+        else:
+            parts.append(text[position:end + 1])
+        position = end + 1
+    else:
+        return None
+    if not values:
+        return None
+    parts.append(text[position:])
+    skeleton = "".join(parts)
+    # Markers are encoded as "\u0000<n>"; any other NUL escape could collide
+    if skeleton.count("\\u0000") != len(values):
+        return None
+    return skeleton, values
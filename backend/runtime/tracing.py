@@ -0,0 +1,203 @@
+"""
+Opt-in per-session tracing in Chrome trace-event format.
+
+A sampled session gets a ``Trace`` stored in a context variable, so every
+``span()`` opened while handling it (stages, graph nodes, LLM and tool calls,
+including work on other tasks and threads spawned from the handler) is
+recorded as a complete event. Each turn is its own track, so a slow turn can
+be read as a flame chart in Perfetto (https://ui.perfetto.dev) or
+chrome://tracing.
+
+When the session is not sampled ``span()`` returns a shared null context
+after a single context-variable lookup.
+"""
+
+import json
+import logging
+import random
+import time
+import uuid
+from collections import deque
+from contextlib import nullcontext
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+MAX_EVENTS_PER_TRACE = 20000
+
+_NULL_SPAN = nullcontext()
+_current: ContextVar[Optional["Trace"]] = ContextVar("trace", default=None)
+
+_sample_rate = 0.0
+_trace_dir: Optional[Path] = None
+_recent: deque = deque(maxlen=50)
+
+
+class Trace:
+    """Spans recorded for one session, one track per turn."""
+
+    def __init__(self, name: str):
+        self.id = uuid.uuid4().hex[:12]
+        self.name = name
+        self.started_at = time.time()
+        self.turn = 0
+        self.events: list[dict] = []
+        self.dropped = 0
+        self._origin_ns = time.perf_counter_ns()
+
+    def now_us(self) -> float:
+        """Microseconds since the trace started."""
+        return (time.perf_counter_ns() - self._origin_ns) / 1000
+
+    def next_turn(self) -> None:
+        """Start a new track for the next turn."""
+        self.turn += 1
+        self.events.append({
+            "name": "thread_name", "ph": "M", "pid": 1, "tid": self.turn,
+            "args": {"name": f"turn {self.turn}"},
+        })
+
+    def add(self, name: str, start_us: float, duration_us: float, tid: int, args: dict) -> None:
+        """Record a complete ('X') event."""
+        if len(self.events) >= MAX_EVENTS_PER_TRACE:
+            self.dropped += 1
+            return
+        event = {"name": name, "ph": "X", "ts": start_us, "dur": duration_us, "pid": 1, "tid": tid}
+        if args:
+            event["args"] = args
+        self.events.append(event)
+
+    def summary(self) -> dict:
+        """Short description for listings."""
+        return {
+            "id": self.id,
+            "name": self.name,
+            "started_at": self.started_at,
+            "turns": self.turn,
+            "events": len(self.events),
+            "dropped": self.dropped,
+        }
+
+    def to_chrome(self) -> dict:
+        """The trace as a Chrome trace-event JSON object."""
+        metadata = [{"name": "process_name", "ph": "M", "pid": 1, "args": {"name": self.name}}]
+        return {"traceEvents": metadata + self.events, "displayTimeUnit": "ms"}
+
+    def dump(self, directory: Path) -> Path:
+        """Write the trace to ``directory`` as ``<id>.json``."""
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"{self.id}.json"
+        path.write_text(json.dumps(self.to_chrome()))
+        return path
+
+
+class _Span:
+    __slots__ = ("trace", "name", "args", "tid", "start_us")
+
+    def __init__(self, trace: Trace, name: str, args: dict):
+        self.trace = trace
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.tid = self.trace.turn
+        self.start_us = self.trace.now_us()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self.trace.add(self.name, self.start_us, self.trace.now_us() - self.start_us, self.tid, self.args)
+        return False
+
+
+def span(name: str, **args):
+    """Context manager recording ``name`` in the current trace, if any.
+
+    Args:
+        name: Span name (e.g. 'stt', 'llm:respond')
+        **args: Small JSON-serializable annotations shown in the viewer
+    """
+    trace = _current.get()
+    if trace is None:
+        return _NULL_SPAN
+    return _Span(trace, name, args)
+
+
+def configure_tracing(sample_rate: float = 0.0, trace_dir: str = "", keep: int = 50) -> None:
+    """Set the session sampling rate and where finished traces go.
+
+    Args:
+        sample_rate: Fraction of sessions traced (0 disables tracing)
+        trace_dir: Directory finished traces are written to ('' keeps them in memory only)
+        keep: Finished traces kept in memory for the debug endpoints
+    """
+    global _sample_rate, _trace_dir, _recent
+    _sample_rate = sample_rate
+    _trace_dir = Path(trace_dir) if trace_dir else None
+    _recent = deque(_recent, maxlen=keep)
+
+
+def start_trace(name: str, force: bool = False) -> Optional[Trace]:
+    """Begin tracing the current task if it is sampled.
+
+    Args:
+        name: Label for the trace (e.g. 'ws_session')
+        force: Trace regardless of the sampling rate
+
+    Returns:
+        The new trace, or None if this session is not traced
+    """
+    if not force and (_sample_rate <= 0 or random.random() >= _sample_rate):
+        return None
+    trace = Trace(name)
+    _current.set(trace)
+    return trace
+
+
+def current_trace() -> Optional[Trace]:
+    """The trace of the current task, if any."""
+    return _current.get()
+
+
+def finish_trace(trace: Trace) -> Optional[Path]:
+    """Keep a finished trace for the debug endpoints and dump it if configured.
+
+    Blocking when a trace directory is set; call it from a worker thread.
+
+    Returns:
+        The file the trace was written to, if any
+    """
+    _recent.append(trace)
+    if _trace_dir is None:
+        return None
+    try:
+        return trace.dump(_trace_dir)
+    except OSError as e:
+        logger.warning(f"Could not write trace {trace.id} to {_trace_dir}: {e}")
+        return None
+
+
+def recent_traces() -> list[Trace]:
+    """Finished traces still held in memory, newest first."""
+    return list(reversed(_recent))
+
+
+def get_trace(trace_id: str) -> Optional[Trace]:
+    """A finished trace still held in memory, by id."""
+    for trace in _recent:
+        if trace.id == trace_id:
+            return trace
+    return None
+
+
+def load_trace_file(trace_id: str) -> Optional[dict]:
+    """A dumped trace by id, as Chrome trace-event JSON."""
+    if _trace_dir is None or not trace_id.isalnum():
+        return None
+    path = _trace_dir / f"{trace_id}.json"
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())
@@ -0,0 +1,90 @@
+"""
+Wire formats for /ws/session frames.
+
+JSON text frames are the default. Clients that offer the ``tutor.msgpack.v1``
+WebSocket subprotocol get MessagePack binary frames with one-letter keys, and
+audio travels as raw bytes instead of base64 in both directions. Either format
+is further compressed by permessage-deflate when the client negotiates it.
+
+MessagePack needs the optional ``ormsgpack`` package; without it the
+subprotocol is simply not accepted and the session falls back to JSON.
+"""
+
+import logging
+from typing import Optional, Union
+
+from . import offload
+
+try:
+    import ormsgpack
+except ImportError:
+    ormsgpack = None
+
+logger = logging.getLogger(__name__)
+
+MSGPACK_SUBPROTOCOL = "tutor.msgpack.v1"
+
+# Frame field names and their compact MessagePack keys
+SHORT_KEYS = {
+    "type": "t",
+    "text": "x",
+    "quality": "q",
+    "turn": "n",
+    "audio": "a",
+    "mimeType": "m",
+}
+LONG_KEYS = {short: long for long, short in SHORT_KEYS.items()}
+
+
+class JsonWire:
+    """Default format: JSON text frames, base64 audio."""
+
+    name = "json"
+    binary = False
+
+    async def encode(self, payload: dict, size_hint: int = 0) -> str:
+        """Serialize a frame, offloading when ``size_hint`` is large."""
+        return await offload.dumps(payload, size_hint)
+
+    async def decode(self, message: str) -> dict:
+        """Parse a client frame."""
+        return await offload.loads(message)
+
+
+class MsgpackWire:
+    """Compact format: MessagePack binary frames with short keys, raw audio bytes."""
+
+    name = "msgpack"
+    binary = True
+
+    # Audio is a raw bin field, so packing is a single copy of the buffer; a
+    # process pool would copy it twice more to pickle it, so both run inline
+
+    async def encode(self, payload: dict, size_hint: int = 0) -> bytes:
+        """Serialize a frame."""
+        return ormsgpack.packb({SHORT_KEYS.get(key, key): value for key, value in payload.items()})
+
+    async def decode(self, message: bytes) -> dict:
+        """Parse a client frame, restoring the long field names."""
+        compact = ormsgpack.unpackb(message)
+        return {LONG_KEYS.get(key, key): value for key, value in compact.items()}
+
+
+Wire = Union[JsonWire, MsgpackWire]
+
+
+def negotiate_wire(subprotocols: list[str]) -> tuple[Wire, Optional[str]]:
+    """Pick the session's wire format from the client's offered subprotocols.
+
+    Args:
+        subprotocols: Values of the client's Sec-WebSocket-Protocol header
+
+    Returns:
+        (wire, subprotocol): the subprotocol to accept is None for plain JSON
+    """
+    if MSGPACK_SUBPROTOCOL in subprotocols:
+        if ormsgpack is not None:
+            return MsgpackWire(), MSGPACK_SUBPROTOCOL
+        logger.warning("Client asked for MessagePack frames but ormsgpack is not installed; using JSON")
+    return JsonWire(), None
+
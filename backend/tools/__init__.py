@@ -0,0 +1,3 @@
+"""
+Operational tools for The Reverse Tutor (load generation, benchmarks).
+"""
@@ -0,0 +1,140 @@
+"""
+Benchmark the analysis node: free-form JSON prompt vs structured output.
+
+Runs the same explanations through three configurations and reports
+latency, output tokens and parse failures for each:
+
+    baseline      the original verbose prompt, verbatim, on the original call:
+                  the provider's large model at temperature 0.7, no token cap
+    legacy-small  the same prompt, uncapped, on the configured analysis model,
+                  to separate the prompt's cost from the model's
+    structured    the compact JSON-mode prompt on the configured analysis model
+
+The verbose prompt is parsed with the original regex, the structured one is
+validated with Pydantic. With ``LLM_PROVIDER=fake`` it only exercises the
+plumbing; point it at a real provider for meaningful numbers.
+
+Usage (from backend/):
+    python -m tools.bench_analysis --rounds 5
+"""
+
+import argparse
+import asyncio
+import json
+import re
+import time
+
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from agent.analysis import JSON_MODE, parse_analysis
+from agent.llm import NodeLLMConfig, create_llm, get_llm, node_config
+from agent.policy import ANALYSIS_LABELS
+from agent.prompts import ANALYSIS_PROMPT
+from config import get_settings
+from tools.loadgen import percentile
+
+# The analysis prompt before structured output, verbatim
+BASELINE_ANALYSIS_PROMPT = """Based on the user's explanation, assess:
+
+1. **Accuracy**: Is their explanation factually correct?
+2. **Depth**: Do they understand the underlying principles or just surface facts?
+3. **Gaps**: What misconceptions or missing pieces exist?
+
+User's explanation: {user_input}
+
+Previous context: {context}
+
+Provide your assessment as JSON:
+{{
+    "accuracy": "correct" | "incorrect" | "partially_correct",
+    "depth": "deep" | "shallow" | "surface",
+    "gaps": ["gap1", "gap2", ...],
+    "quality": "correct" | "incorrect" | "vague" | "shallow"
+}}"""
+
+# The original analysis call shared the reply model's settings
+BASELINE_TEMPERATURE = 0.7
+
+SYSTEM = "You are an expert at analyzing explanations for accuracy and depth. Respond only with valid JSON."
+
+EXPLANATIONS = [
+    "Photosynthesis is when plants use sunlight to turn carbon dioxide and water into glucose and oxygen.",
+    "Gravity pulls things down because heavier objects fall faster than lighter ones.",
+    "A neural network learns by adjusting weights with gradient descent to reduce the loss on training data.",
+    "Inflation is basically when stuff gets more expensive over time for some reason.",
+    "Vaccines work by training the immune system to recognize a pathogen's antigens so memory cells respond faster later.",
+    "The seasons happen because the Earth is closer to the sun in summer.",
+]
+
+
+def parse_legacy(content: str) -> bool:
+    """The original parse: first flat {...} block, quality must be a known label."""
+    match = re.search(r'\{[^{}]*\}', content, re.DOTALL)
+    if not match:
+        return False
+    try:
+        return json.loads(match.group()).get("quality") in ANALYSIS_LABELS
+    except json.JSONDecodeError:
+        return False
+
+
+async def measure(llm, prompt: str, parse, rounds: int) -> tuple[list[float], list[int], int]:
+    """Latency, output tokens and parse failures over all explanations."""
+    latencies, tokens, failures = [], [], 0
+    for _ in range(rounds):
+        for user_input in EXPLANATIONS:
+            started = time.perf_counter()
+            response = await llm.ainvoke([
+                SystemMessage(content=SYSTEM),
+                HumanMessage(content=prompt.format(user_input=user_input, context="No previous context")),
+            ])
+            latencies.append(time.perf_counter() - started)
+            tokens.append((getattr(response, "usage_metadata", None) or {}).get("output_tokens", 0))
+            if not parse(response.content):
+                failures += 1
+    return latencies, tokens, failures
+
+
+def report(label: str, latencies: list[float], tokens: list[int], failures: int) -> None:
+    print(
+        f"{label:<13} latency p50={percentile(latencies, 50) * 1000:7.1f}ms "
+        f"p90={percentile(latencies, 90) * 1000:7.1f}ms   "
+        f"output tokens avg={sum(tokens) / len(tokens):6.1f}   "
+        f"parse failures={failures}/{len(latencies)}"
+    )
+
+
+async def main(args) -> None:
+    settings = get_settings()
+    config = node_config(settings, "analyze")
+    provider = settings.llm_provider
+    baseline_config = NodeLLMConfig(
+        provider=provider,
+        model={"openai": settings.openai_model, "fake": "fake"}.get(provider, settings.groq_model),
+        temperature=BASELINE_TEMPERATURE,
+        max_tokens=None,
+    )
+    print(
+        f"Baseline model: {baseline_config.provider}/{baseline_config.model} "
+        f"(temperature {BASELINE_TEMPERATURE}, uncapped)\n"
+        f"Analysis model: {config.provider}/{config.model} (temperature {config.temperature})\n"
+    )
+
+    baseline = create_llm(settings, baseline_config)
+    legacy_small = create_llm(settings, NodeLLMConfig(config.provider, config.model, config.temperature, None))
+    structured = get_llm(settings, "analyze").bind(**JSON_MODE)
+    report("baseline", *await measure(baseline, BASELINE_ANALYSIS_PROMPT, parse_legacy, args.rounds))
+    report("legacy-small", *await measure(legacy_small, BASELINE_ANALYSIS_PROMPT, parse_legacy, args.rounds))
+    report("structured", *await measure(
+        structured, ANALYSIS_PROMPT, lambda content: parse_analysis(content) is not None, args.rounds,
+    ))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark free-form vs structured analysis output")
+    parser.add_argument("--rounds", type=int, default=3, help="Passes over the sample explanations")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
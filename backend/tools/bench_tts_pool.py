@@ -0,0 +1,106 @@
+"""
+Benchmark Edge TTS time-to-first-audio-byte with and without connection pooling.
+
+Runs a local fake of the Edge synthesis WebSocket (configurable handshake and
+synthesis delays) and measures time-to-first-byte and total time for repeated
+synthesis calls through EdgeTTS, once opening a fresh connection per call and
+once through the connection pool.
+
+Usage (from backend/):
+    python -m tools.bench_tts_pool --requests 50 --handshake-ms 120
+"""
+
+import argparse
+import asyncio
+import time
+
+from aiohttp import web
+
+from audio.edge_pool import EdgeConnectionPool
+from audio.tts import EdgeTTS
+from tools.loadgen import percentile
+
+
+def audio_frame(data: bytes) -> bytes:
+    """Binary audio message: 2-byte header length, headers, audio."""
+    headers = b"X-RequestId:fake\r\nContent-Type:audio/mpeg\r\nPath:audio\r\n"
+    return len(headers).to_bytes(2, "big") + headers + data
+
+
+def make_fake_server(handshake_ms: float, first_byte_ms: float, chunks: int) -> web.Application:
+    """Fake synthesis service speaking the Edge TTS WebSocket protocol."""
+
+    async def handler(request: web.Request) -> web.WebSocketResponse:
+        # Stand-in for TCP + TLS + upgrade round trips to a remote service
+        await asyncio.sleep(handshake_ms / 1000)
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        async for message in ws:
+            if message.type != web.WSMsgType.TEXT or "Path:ssml" not in message.data:
+                continue
+            await ws.send_str("X-RequestId:fake\r\nPath:turn.start\r\n\r\n{}")
+            await asyncio.sleep(first_byte_ms / 1000)
+            for _ in range(chunks):
+                await ws.send_bytes(audio_frame(bytes(4096)))
+            await ws.send_str("X-RequestId:fake\r\nPath:turn.end\r\n\r\n{}")
+        return ws
+
+    app = web.Application()
+    app.router.add_get("/edge/v1", handler)
+    return app
+
+
+async def measure(tts: EdgeTTS, requests: int, text: str) -> tuple[list[float], list[float]]:
+    """Time-to-first-byte and total time for sequential synthesis calls."""
+    first_bytes, totals = [], []
+    for _ in range(requests):
+        started = time.perf_counter()
+        first = None
+        async for _chunk in tts.stream(text):
+            if first is None:
+                first = time.perf_counter() - started
+        first_bytes.append(first)
+        totals.append(time.perf_counter() - started)
+    return first_bytes, totals
+
+
+def report(label: str, first_bytes: list[float], totals: list[float]) -> None:
+    print(
+        f"{label:<10} TTFB p50={percentile(first_bytes, 50) * 1000:7.1f}ms "
+        f"p90={percentile(first_bytes, 90) * 1000:7.1f}ms   "
+        f"total p50={percentile(totals, 50) * 1000:7.1f}ms"
+    )
+
+
+async def main(args) -> None:
+    runner = web.AppRunner(make_fake_server(args.handshake_ms, args.first_byte_ms, args.chunks))
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    url = f"ws://127.0.0.1:{port}/edge/v1?TrustedClientToken=fake"
+    text = "Why does that happen? What would change if the light were removed?"
+
+    print(f"Fake Edge TTS server: handshake={args.handshake_ms}ms first-byte={args.first_byte_ms}ms\n")
+    try:
+        for label, pool_size in (("fresh", 0), ("pooled", 4)):
+            pool = EdgeConnectionPool(url=url, max_idle_connections=pool_size)
+            try:
+                report(label, *await measure(EdgeTTS(pool=pool), args.requests, text))
+            finally:
+                await pool.close()
+    finally:
+        await runner.cleanup()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark Edge TTS connection pooling")
+    parser.add_argument("--requests", type=int, default=50, help="Synthesis calls per mode")
+    parser.add_argument("--handshake-ms", type=float, default=120, help="Simulated connection setup time")
+    parser.add_argument("--first-byte-ms", type=float, default=40, help="Simulated synthesis latency")
+    parser.add_argument("--chunks", type=int, default=8, help="Audio frames per request")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,136 @@
+"""
+Benchmark /ws/session wire formats: bytes per turn and server CPU per frame.
+
+Encodes the frames of a typical turn (transcript, response, audio) with the
+server's JSON and MessagePack encoders, optionally compressing each message
+the way permessage-deflate does (one raw-deflate stream per connection with
+context takeover). Sessions are interleaved round-robin, each with its own
+compressor, so cache pressure and per-session deflate memory at high session
+counts show up in the numbers.
+
+Usage (from backend/):
+    python -m tools.bench_wire --sessions 1,100,1000 --turns 5
+"""
+
+import argparse
+import asyncio
+import base64
+import random
+import time
+import zlib
+
+from agent.graph import extract_response_text
+from agent.fake_llm import FAKE_RESPONSE
+from audio.fake import FAKE_TRANSCRIPT
+from runtime.offload import configure_offload
+from runtime.wire import JsonWire, MsgpackWire, ormsgpack
+from tools.loadgen import DEFAULT_TEXT_TURNS
+
+SYNC_FLUSH_TAIL = b"\x00\x00\xff\xff"
+
+
+def frame_header_size(length: int) -> int:
+    """WebSocket header bytes for an unmasked server frame."""
+    return 2 if length < 126 else 4 if length < 65536 else 10
+
+
+def deflate_state_kb(window_bits: int, mem_level: int) -> float:
+    """zlib's documented memory use for one compressor plus one decompressor."""
+    compress = (1 << (window_bits + 2)) + (1 << (mem_level + 9))
+    decompress = 1 << window_bits
+    return (compress + decompress) / 1024
+
+
+def make_turns(turns: int, audio_kb: int) -> list[tuple[str, str, bytes]]:
+    """Distinct (transcript, response, audio) per turn, so deflate cannot reuse earlier turns."""
+    rng = random.Random(0)
+    vocabulary = " ".join([FAKE_TRANSCRIPT, extract_response_text(FAKE_RESPONSE), *DEFAULT_TEXT_TURNS]).split()
+    return [
+        (
+            " ".join(rng.choices(vocabulary, k=30)),
+            " ".join(rng.choices(vocabulary, k=60)) + "?",
+            rng.randbytes(audio_kb * 1024),  # MP3 is effectively incompressible
+        )
+        for _ in range(turns)
+    ]
+
+
+def turn_payloads(turn: int, content: tuple[str, str, bytes], binary: bool) -> list[dict]:
+    """The server frames of one turn."""
+    transcript, response, audio = content
+    return [
+        {"type": "transcript", "text": transcript},
+        {"type": "response", "text": response, "quality": "shallow", "turn": turn + 1},
+        {
+            "type": "audio",
+            "audio": audio if binary else base64.b64encode(audio).decode("utf-8"),
+            "mimeType": "audio/mp3",
+        },
+    ]
+
+
+async def measure(wire, deflate: bool, sessions: int, contents: list, window_bits: int, mem_level: int) -> dict:
+    """Wire bytes per turn and CPU per frame across interleaved sessions."""
+    compressors = [
+        zlib.compressobj(wbits=-window_bits, memLevel=mem_level) if deflate else None
+        for _ in range(sessions)
+    ]
+    control_bytes = total_bytes = frames = 0
+    cpu_started = time.process_time()
+    for turn, content in enumerate(contents):
+        for compressor in compressors:
+            for payload in turn_payloads(turn, content, wire.binary):
+                data = await wire.encode(payload)
+                if not wire.binary:
+                    data = data.encode("utf-8")
+                if compressor is not None:
+                    data = (compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH))[:-len(SYNC_FLUSH_TAIL)]
+                size = len(data) + frame_header_size(len(data))
+                total_bytes += size
+                if payload["type"] != "audio":
+                    control_bytes += size
+                frames += 1
+    cpu = time.process_time() - cpu_started
+    turn_count = sessions * len(contents)
+    return {
+        "control_bytes_per_turn": control_bytes / turn_count,
+        "total_kb_per_turn": total_bytes / turn_count / 1024,
+        "us_per_frame": cpu / frames * 1e6,
+        "deflate_kb_per_session": deflate_state_kb(window_bits, mem_level) if deflate else 0.0,
+    }
+
+
+async def main(args) -> None:
+    # Measure the encoders inline, as for typical frame sizes
+    configure_offload(threshold_bytes=1 << 40)
+    contents = make_turns(args.turns, args.audio_kb)
+    wires = [JsonWire()] + ([MsgpackWire()] if ormsgpack is not None else [])
+    if ormsgpack is None:
+        print("ormsgpack is not installed; benchmarking JSON only\n")
+
+    print(f"audio={args.audio_kb}KB/turn  deflate window_bits={args.window_bits} memLevel={args.mem_level}\n")
+    print(f"{'sessions':>8}  {'format':<16} {'control B/turn':>14} {'total KB/turn':>13} {'CPU us/frame':>12} {'deflate KB/session':>18}")
+    for sessions in (int(n) for n in args.sessions.split(",")):
+        for wire in wires:
+            for deflate in (False, True):
+                result = await measure(wire, deflate, sessions, contents, args.window_bits, args.mem_level)
+                label = f"{wire.name}{'+deflate' if deflate else ''}"
+                print(
+                    f"{sessions:>8}  {label:<16} {result['control_bytes_per_turn']:>14.0f} "
+                    f"{result['total_kb_per_turn']:>13.1f} {result['us_per_frame']:>12.1f} "
+                    f"{result['deflate_kb_per_session']:>18.0f}"
+                )
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark WebSocket frame encodings")
+    parser.add_argument("--sessions", default="1,100,1000", help="Comma-separated concurrent session counts")
+    parser.add_argument("--turns", type=int, default=5, help="Turns per session")
+    parser.add_argument("--audio-kb", type=int, default=24, help="TTS audio per turn")
+    parser.add_argument("--window-bits", type=int, default=15, help="Deflate window (uvicorn's default is 15)")
+    parser.add_argument("--mem-level", type=int, default=8, help="Deflate memLevel (zlib's default is 8)")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
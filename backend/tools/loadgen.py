@@ -0,0 +1,406 @@
+"""
+End-to-end WebSocket load generator for /ws/session.
+
+Simulates N concurrent students who each connect, send recorded audio clips
+(or text turns), wait for the transcript, response and audio frames, then
+"listen and think" before the next turn. N is ramped in steps and each step
+reports time-to-transcript / response / audio percentiles and error rates.
+
+Usage (from backend/):
+    # Against a running server
+    python -m tools.loadgen --url ws://localhost:8000/ws/session --ramp 1,5,10,25
+
+    # Spawn a local server with fake LLM/STT/TTS providers to find the
+    # saturation point of a single process
+    python -m tools.loadgen --local --ramp 10,50,100,200 --turns 5 --slo-ms 2000
+
+    # Same, using MessagePack frames instead of JSON
+    python -m tools.loadgen --local --ramp 10,50,100 --wire msgpack
+
+Client frames are encoded once up front, and permessage-deflate is only
+offered for text turns by default (``--deflate auto``): compressing
+multi-megabyte clips on the client's own event loop delays the timestamps of
+every other student's replies. The client's loop lag is reported next to the
+server's so a client-bound run is visible.
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+import httpx
+import websockets
+
+from runtime.wire import LONG_KEYS, MSGPACK_SUBPROTOCOL, SHORT_KEYS, ormsgpack
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+# Client loop lag above which the reported timings are not trustworthy
+CLIENT_LAG_WARN_MS = 50.0
+
+MIME_TYPES = {
+    ".webm": "audio/webm",
+    ".wav": "audio/wav",
+    ".mp3": "audio/mp3",
+    ".ogg": "audio/ogg",
+    ".m4a": "audio/mp4",
+}
+
+DEFAULT_TEXT_TURNS = [
+    "Photosynthesis is how plants make food from sunlight.",
+    "Chlorophyll absorbs light energy and uses it to split water molecules.",
+    "The Calvin cycle then uses that energy to fix carbon dioxide into sugar.",
+    "Backpropagation computes gradients of the loss with respect to each weight.",
+    "It applies the chain rule layer by layer from the output back to the input.",
+    "I give up, can you explain it?",
+]
+
+
+@dataclass
+class TurnResult:
+    """Timings (seconds from send) for one turn."""
+
+    transcript: Optional[float] = None
+    response: Optional[float] = None
+    audio: Optional[float] = None
+    bytes_received: int = 0
+    error: Optional[str] = None
+
+
+@dataclass
+class StepResult:
+    """All turns recorded while running N students."""
+
+    students: int
+    turns: list[TurnResult] = field(default_factory=list)
+    connect_errors: int = 0
+    elapsed: float = 0.0
+    client_lags: list[float] = field(default_factory=list)
+
+
+def load_clips(audio_dir: str) -> list[tuple[str, str]]:
+    """Load audio clips as (base64, mime type) pairs."""
+    clips = []
+    for path in sorted(Path(audio_dir).iterdir()):
+        mime_type = MIME_TYPES.get(path.suffix.lower())
+        if mime_type:
+            clips.append((base64.b64encode(path.read_bytes()).decode("utf-8"), mime_type))
+    if not clips:
+        raise SystemExit(f"No audio clips found in {audio_dir}")
+    return clips
+
+
+def load_texts(text_file: Optional[str]) -> list[str]:
+    """Load text turns, one per line."""
+    if not text_file:
+        return DEFAULT_TEXT_TURNS
+    lines = [line.strip() for line in Path(text_file).read_text(encoding="utf-8").splitlines()]
+    return [line for line in lines if line]
+
+
+def think_time(mean: float) -> float:
+    """Sample a listen-and-think pause (log-normal with the given mean)."""
+    if mean <= 0:
+        return 0.0
+    sigma = 0.5
+    return random.lognormvariate(math.log(mean) - sigma ** 2 / 2, sigma)
+
+
+def percentile(values: list[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile of ``values`` (0-100)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(len(ordered) * q / 100) - 1)]
+
+
+def encode_frame(payload: dict, wire: str):
+    """Serialize a client frame in the session's wire format."""
+    if wire == "msgpack":
+        return ormsgpack.packb({SHORT_KEYS.get(key, key): value for key, value in payload.items()})
+    return json.dumps(payload)
+
+
+def decode_frame(message, wire: str) -> dict:
+    """Parse a server frame in the session's wire format."""
+    if wire == "msgpack":
+        return {LONG_KEYS.get(key, key): value for key, value in ormsgpack.unpackb(message).items()}
+    return json.loads(message)
+
+
+async def run_turn(ws, frame, timeout: float, wire: str = "json") -> TurnResult:
+    """Send one pre-encoded turn and wait for its response and audio frames."""
+    result = TurnResult()
+    started = time.perf_counter()
+    await ws.send(frame)
+
+    try:
+        async with asyncio.timeout(timeout):
+            while True:
+                message = await ws.recv()
+                elapsed = time.perf_counter() - started
+                result.bytes_received += len(message)
+                frame = decode_frame(message, wire)
+                kind = frame.get("type")
+                if kind == "transcript":
+                    result.transcript = elapsed
+                elif kind == "response":
+                    result.response = elapsed
+                elif kind == "audio":
+                    result.audio = elapsed
+                    break
+                elif kind == "error":
+                    result.error = "server_error"
+                    break
+    except TimeoutError:
+        result.error = "no_audio" if result.response is not None else "timeout"
+    return result
+
+
+async def run_student(student_id: int, args, frames: list, step: StepResult, start_delay: float):
+    """Simulate one student for ``args.turns`` turns."""
+    await asyncio.sleep(start_delay)
+    try:
+        ws = await websockets.connect(
+            args.url,
+            max_size=None,
+            open_timeout=args.turn_timeout,
+            subprotocols=[MSGPACK_SUBPROTOCOL] if args.wire == "msgpack" else None,
+            compression="deflate" if args.use_deflate else None,
+        )
+    except Exception:
+        step.connect_errors += 1
+        return
+    if args.wire == "msgpack" and ws.subprotocol != MSGPACK_SUBPROTOCOL:
+        step.connect_errors += 1
+        await ws.close()
+        return
+
+    try:
+        for turn in range(args.turns):
+            frame = frames[(student_id + turn) % len(frames)]
+            result = await run_turn(ws, frame, args.turn_timeout, args.wire)
+            step.turns.append(result)
+            if result.error == "timeout":
+                break
+            await asyncio.sleep(think_time(args.think_time))
+    except websockets.ConnectionClosed:
+        step.turns.append(TurnResult(error="disconnected"))
+    finally:
+        await ws.close()
+
+
+async def sample_loop_lag(lags: list[float], interval: float = 0.05) -> None:
+    """Record how late this process's event loop wakes up, until cancelled."""
+    while True:
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, time.perf_counter() - started - interval))
+
+
+async def run_step(students: int, args, frames: list) -> StepResult:
+    """Run ``students`` concurrent students, staggered over the ramp-up time."""
+    step = StepResult(students=students)
+    sampler = asyncio.create_task(sample_loop_lag(step.client_lags))
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        run_student(i, args, frames, step, args.ramp_up * i / students)
+        for i in range(students)
+    ))
+    step.elapsed = time.perf_counter() - started
+    sampler.cancel()
+    return step
+
+
+def summarize(step: StepResult) -> dict:
+    """Aggregate a step into percentiles and error rates."""
+    attempts = len(step.turns) + step.connect_errors
+    errors: dict[str, int] = {}
+    for turn in step.turns:
+        if turn.error:
+            errors[turn.error] = errors.get(turn.error, 0) + 1
+    if step.connect_errors:
+        errors["connect"] = step.connect_errors
+
+    summary = {
+        "students": step.students,
+        "turns": len(step.turns),
+        "elapsed_s": round(step.elapsed, 2),
+        "turns_per_s": round(len(step.turns) / step.elapsed, 2) if step.elapsed else 0.0,
+        "error_rate": round(sum(errors.values()) / attempts, 4) if attempts else 0.0,
+        "errors": errors,
+        "kb_per_turn": round(sum(t.bytes_received for t in step.turns) / max(1, len(step.turns)) / 1024, 1),
+    }
+    for metric in ("transcript", "response", "audio"):
+        values = [getattr(t, metric) for t in step.turns if getattr(t, metric) is not None]
+        summary[f"time_to_{metric}_ms"] = {
+            f"p{q}": round(v * 1000, 1) if (v := percentile(values, q)) is not None else None
+            for q in (50, 90, 99)
+        }
+    if step.client_lags:
+        summary["client"] = {
+            "loop_lag_p99_ms": round(percentile(step.client_lags, 99) * 1000, 1),
+            "loop_lag_max_ms": round(max(step.client_lags) * 1000, 1),
+        }
+    return summary
+
+
+def fetch_server_metrics(url: str) -> Optional[dict]:
+    """Read the server's event-loop lag histogram from /metrics, if reachable."""
+    http_url = url.replace("wss://", "https://").replace("ws://", "http://")
+    http_url = http_url.split("/ws/")[0].split("?")[0] + "/metrics"
+    try:
+        snapshot = httpx.get(http_url, timeout=5.0).json()
+    except Exception:
+        return None
+    lag = snapshot.get("histograms", {}).get("event_loop_lag_seconds")
+    return {"loop_lag_p99_ms": round(lag["p99"] * 1000, 1), "loop_lag_max_ms": round(lag["max"] * 1000, 1)} if lag else None
+
+
+def print_summary(summary: dict) -> None:
+    """Print one step as a compact line-oriented report."""
+    print(
+        f"N={summary['students']:<5} turns={summary['turns']:<6} "
+        f"rate={summary['turns_per_s']:.2f}/s errors={summary['error_rate']:.2%} {summary['errors'] or ''}"
+    )
+    for metric in ("transcript", "response", "audio"):
+        p = summary[f"time_to_{metric}_ms"]
+        if p["p50"] is not None:
+            print(f"    time-to-{metric:<10} p50={p['p50']:>8.1f}ms  p90={p['p90']:>8.1f}ms  p99={p['p99']:>8.1f}ms")
+    if summary.get("server"):
+        print(f"    server loop lag     p99={summary['server']['loop_lag_p99_ms']}ms  max={summary['server']['loop_lag_max_ms']}ms")
+    if summary.get("client"):
+        client = summary["client"]
+        warning = "  (client-bound: timings include the client's own stalls)" if client["loop_lag_p99_ms"] > CLIENT_LAG_WARN_MS else ""
+        print(f"    client loop lag     p99={client['loop_lag_p99_ms']}ms  max={client['loop_lag_max_ms']}ms{warning}")
+
+
+def free_port() -> int:
+    """Pick an unused local TCP port."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_local_server(args) -> tuple[subprocess.Popen, str]:
+    """Start a single uvicorn process wired to the fake providers."""
+    port = free_port()
+    env = {
+        **os.environ,
+        "LLM_PROVIDER": "fake",
+        "STT_ENGINE": "fake",
+        "TTS_ENGINE": "fake",
+        "TAVILY_API_KEY": "",
+        "FAKE_LLM_LATENCY_MS": str(args.fake_llm_ms),
+        "FAKE_STT_LATENCY_MS": str(args.fake_stt_ms),
+        "FAKE_TTS_LATENCY_MS": str(args.fake_tts_ms),
+        "ANALYSIS_BATCHING": "true" if args.batching else "false",
+    }
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1.0).status_code == 200:
+                return process, f"ws://127.0.0.1:{port}/ws/session"
+        except httpx.HTTPError:
+            pass
+        if process.poll() is not None:
+            break
+        time.sleep(0.2)
+    process.terminate()
+    raise SystemExit("Local server failed to start")
+
+
+async def main(args) -> list[dict]:
+    """Ramp through the configured student counts."""
+    clips = load_clips(args.audio_dir) if args.audio_dir else []
+    texts = load_texts(args.text_file)
+    if args.wire == "msgpack":
+        clips = [(base64.b64decode(audio), mime_type) for audio, mime_type in clips]
+    ramp = [int(n) for n in args.ramp.split(",")]
+    args.use_deflate = args.deflate == "on" or (args.deflate == "auto" and not clips)
+
+    # Encode every turn once, outside the timed path
+    payloads = (
+        [{"type": "audio", "audio": audio, "mimeType": mime_type} for audio, mime_type in clips]
+        or [{"type": "text", "text": text} for text in texts]
+    )
+    frames = [encode_frame(payload, args.wire) for payload in payloads]
+
+    print(
+        f"🎯 Target: {args.url}  ({'audio clips' if clips else 'text turns'}, {args.turns} turns/student, "
+        f"wire={args.wire}{'+deflate' if args.use_deflate else ''})\n"
+    )
+    summaries = []
+    for students in ramp:
+        step = await run_step(students, args, frames)
+        summary = summarize(step)
+        summary["server"] = fetch_server_metrics(args.url)
+        summaries.append(summary)
+        print_summary(summary)
+
+        p90 = summary["time_to_response_ms"]["p90"]
+        if (args.slo_ms and p90 is not None and p90 > args.slo_ms) or summary["error_rate"] > args.max_error_rate:
+            print(f"\n🔥 Saturated at N={students} (p90 time-to-response={p90}ms, errors={summary['error_rate']:.2%})")
+            break
+    return summaries
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Load test /ws/session with simulated students")
+    parser.add_argument("--url", default="ws://localhost:8000/ws/session", help="WebSocket session URL")
+    parser.add_argument("--local", action="store_true", help="Spawn a local server with fake providers")
+    parser.add_argument("--ramp", default="1,5,10,25", help="Comma-separated concurrent student counts")
+    parser.add_argument("--turns", type=int, default=5, help="Turns per student")
+    parser.add_argument("--think-time", type=float, default=4.0, help="Mean listen+think pause between turns (s)")
+    parser.add_argument("--ramp-up", type=float, default=5.0, help="Seconds over which a step's students connect")
+    parser.add_argument("--turn-timeout", type=float, default=60.0, help="Seconds to wait for a turn to complete")
+    parser.add_argument("--audio-dir", help="Directory of recorded clips to replay (.webm/.wav/.mp3/.ogg)")
+    parser.add_argument("--text-file", help="Text turns, one per line (used when no audio dir is given)")
+    parser.add_argument("--slo-ms", type=float, default=0, help="Stop ramping when p90 time-to-response exceeds this")
+    parser.add_argument("--max-error-rate", type=float, default=0.05, help="Stop ramping above this error rate")
+    parser.add_argument("--fake-llm-ms", type=int, default=300, help="Fake LLM latency per call (--local)")
+    parser.add_argument("--fake-stt-ms", type=int, default=200, help="Fake STT latency (--local)")
+    parser.add_argument("--fake-tts-ms", type=int, default=150, help="Fake TTS latency (--local)")
+    parser.add_argument("--batching", action="store_true", help="Enable analysis micro-batching (--local)")
+    parser.add_argument("--wire", choices=("json", "msgpack"), default="json", help="Frame encoding to negotiate")
+    parser.add_argument(
+        "--deflate", choices=("auto", "on", "off"), default="auto",
+        help="Offer permessage-deflate (auto: only for text turns, not audio clips)",
+    )
+    parser.add_argument("--no-deflate", dest="deflate", action="store_const", const="off", help=argparse.SUPPRESS)
+    parser.add_argument("--json", dest="json_out", help="Write step summaries to this JSON file")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    server = None
+    if args.local:
+        server, args.url = start_local_server(args)
+    try:
+        summaries = asyncio.run(main(args))
+        if args.json_out:
+            Path(args.json_out).write_text(json.dumps(summaries, indent=2), encoding="utf-8")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()